@@ -0,0 +1,183 @@
+"""Per-route-class admission control.
+
+Each request is classified (auth, timer writes, reports, sync, bulk imports,
+everything else) and must acquire a slot in its class before reaching the
+handler. Requests wait in a bounded queue for at most ``queue_timeout``
+seconds; when the queue is full or the wait runs out they are shed with
+``503 Service Unavailable`` and a ``Retry-After`` header instead of piling up
+behind the threadpool and DB pool.
+
+Class concurrency is carved out of the DB connection pool, so an admitted
+request never waits for a connection and the ``timer`` share is reserved for
+timer start/stop no matter how busy the other classes are.
+"""
+
+import asyncio
+import json
+import os
+import re
+import weakref
+from dataclasses import dataclass, field
+
+from dotenv import load_dotenv
+
+from app.database import DB_POOL_CAPACITY
+
+load_dotenv()
+
+_TIMER_PATH = re.compile(r"^/api/tasks/\d+/(start|stop)$")
+
+
+@dataclass
+class RouteClassLimiter:
+    name: str
+    concurrency: int
+    max_queue: int
+    queue_timeout: float
+    active: int = 0
+    waiting: int = 0
+    admitted: int = 0
+    shed: int = 0
+    _semaphores: weakref.WeakKeyDictionary = field(
+        init=False, repr=False, default_factory=weakref.WeakKeyDictionary
+    )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Return the semaphore for the running event loop, creating it on first use.
+
+        A semaphore binds to the first loop that waits on it, so one created at
+        import time fails as soon as requests on another loop contend for it.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    async def acquire(self) -> bool:
+        semaphore = self._semaphore()
+        if self.waiting >= self.max_queue and semaphore.locked():
+            self.shed += 1
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            return False
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore().release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
+
+
+# name -> (share of DB connections, max_queue, queue_timeout seconds);
+# "default" gets the connections left over by the other classes.
+DEFAULT_LIMITS = {
+    "auth": (0.15, 32, 2.0),
+    "timer": (0.3, 64, 1.0),
+    "reports": (0.15, 8, 5.0),
+    "sync": (0.15, 64, 2.0),
+    # Uploads hold their slot for as long as the body takes to arrive.
+    "import": (0.1, 4, 1.0),
+    "default": (None, 64, 2.0),
+}
+
+
+def classify(path: str) -> str | None:
+    """Return the route class for a request path, or None if it is not limited."""
+    if not path.startswith("/api/") or path.startswith("/api/health"):
+        return None
+    if path.startswith("/api/auth"):
+        return "auth"
+    if _TIMER_PATH.match(path):
+        return "timer"
+    if path.startswith(("/api/time-summary", "/api/analytics")):
+        return "reports"
+    if path.startswith("/api/sync"):
+        return "sync"
+    if path == "/api/import/time-entries":
+        return "import"
+    return "default"
+
+
+def default_concurrency(pool_capacity: int) -> dict[str, int]:
+    """Split ``pool_capacity`` connections between the classes, at least one each."""
+    concurrency = {
+        name: max(int(pool_capacity * share), 1)
+        for name, (share, _, _) in DEFAULT_LIMITS.items()
+        if share is not None
+    }
+    concurrency["default"] = max(pool_capacity - sum(concurrency.values()), 1)
+    return concurrency
+
+
+def build_limiters(pool_capacity: int = DB_POOL_CAPACITY) -> dict[str, RouteClassLimiter]:
+    """Create limiters from DEFAULT_LIMITS, overridable via ADMISSION_<CLASS>_* env vars."""
+    shares = default_concurrency(pool_capacity)
+    limiters = {}
+    for name, (_, max_queue, queue_timeout) in DEFAULT_LIMITS.items():
+        concurrency = shares[name]
+        prefix = f"ADMISSION_{name.upper()}_"
+        limiters[name] = RouteClassLimiter(
+            name=name,
+            concurrency=int(os.getenv(prefix + "CONCURRENCY", concurrency)),
+            max_queue=int(os.getenv(prefix + "QUEUE", max_queue)),
+            queue_timeout=float(os.getenv(prefix + "TIMEOUT", queue_timeout)),
+        )
+    return limiters
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app, limiters: dict[str, RouteClassLimiter] | None = None, retry_after: int = 1):
+        self.app = app
+        self.limiters = limiters if limiters is not None else build_limiters()
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify(scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[route_class]
+        if not await limiter.acquire():
+            await self._reject(send, route_class)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _reject(self, send, route_class: str) -> None:
+        body = json.dumps({"detail": f"Server busy ({route_class}), retry later"}).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    (b"retry-after", str(self.retry_after).encode("ascii")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
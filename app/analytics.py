@@ -0,0 +1,160 @@
+"""Productivity analytics computed in one pass over SQL aggregates.
+
+The database groups closed entries by task and day (and archived history from
+``time_entry_daily_totals`` the same way); everything else is folded from
+those few thousand rows, never from per-entry ORM objects. Session
+percentiles are selected by the database too (``percentile_disc`` on
+PostgreSQL, one ``ORDER BY ... LIMIT 1 OFFSET k`` per percentile on SQLite).
+Archived entries keep no per-entry durations in the rollup, so percentiles
+cover unarchived entries only; ``session_percentiles_entry_count`` says how
+many.
+"""
+
+import math
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import Task, TimeEntry, TimeEntryDailyTotal
+
+PERCENTILES = (50, 90, 95)
+
+
+def _as_date(value) -> date:
+    # func.date() gives a string on SQLite and a date on PostgreSQL.
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+def compute_analytics(db: Session, user_id: int, date_from: datetime, date_to: datetime) -> dict:
+    """Analytics for closed entries starting in ``[date_from, date_to)``."""
+    tasks = {
+        task_id: (priority, task_status, due_date)
+        for task_id, priority, task_status, due_date in db.execute(
+            select(Task.id, Task.priority, Task.status, Task.due_date).where(Task.user_id == user_id)
+        )
+    }
+    user_task_ids = select(Task.id).where(Task.user_id == user_id)
+    hot_filters = (
+        TimeEntry.task_id.in_(user_task_ids),
+        TimeEntry.start_time >= date_from,
+        TimeEntry.start_time < date_to,
+        TimeEntry.end_time.isnot(None),
+    )
+
+    entry_day = func.date(TimeEntry.start_time)
+    if db.get_bind().dialect.name == "postgresql":
+        # date(timestamptz) follows the session TimeZone; bucket by UTC day
+        # like time_entry_daily_totals does.
+        entry_day = func.date(func.timezone("UTC", TimeEntry.start_time))
+    hot_daily = db.execute(
+        select(TimeEntry.task_id, entry_day, func.sum(TimeEntry.duration_seconds), func.count())
+        .where(*hot_filters)
+        .group_by(TimeEntry.task_id, entry_day)
+    ).all()
+    hot_count = sum(count for *_, count in hot_daily)
+    daily = hot_daily + db.execute(
+        select(
+            TimeEntryDailyTotal.task_id,
+            TimeEntryDailyTotal.day,
+            TimeEntryDailyTotal.total_seconds,
+            TimeEntryDailyTotal.entry_count,
+        ).where(
+            TimeEntryDailyTotal.task_id.in_(user_task_ids),
+            TimeEntryDailyTotal.day >= date_from.date(),
+            TimeEntryDailyTotal.day < date_to.date(),
+        )
+    ).all()
+
+    by_priority: dict[str, list[float]] = {}
+    by_status: dict[str, list[float]] = {}
+    total_seconds = 0.0
+    entry_count = 0
+    overdue_seconds = 0.0
+    overdue_tasks = set()
+    days = set()
+    for task_id, day, seconds, count in daily:
+        priority, task_status, due_date = tasks[task_id]
+        day = _as_date(day)
+        seconds, count = float(seconds or 0), int(count or 0)
+        total_seconds += seconds
+        entry_count += count
+        days.add(day)
+        for bucket, key in ((by_priority, priority), (by_status, task_status)):
+            totals = bucket.setdefault(key, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += count
+        if due_date is not None and day > due_date:
+            overdue_seconds += seconds
+            overdue_tasks.add(task_id)
+
+    last_day = (date_to - timedelta(days=1)).date()
+    longest, current = _streaks(sorted(days), last_day)
+
+    return {
+        "start_date": date_from.date(),
+        "end_date": last_day,
+        "total_seconds": total_seconds,
+        "entry_count": entry_count,
+        "average_session_seconds": total_seconds / entry_count if entry_count else 0.0,
+        "session_percentiles": _session_percentiles(db, hot_filters, hot_count),
+        "session_percentiles_entry_count": hot_count,
+        "by_priority": _breakdown(by_priority),
+        "by_status": _breakdown(by_status),
+        "overdue_seconds": overdue_seconds,
+        "overdue_task_count": len(overdue_tasks),
+        "active_days": len(days),
+        "longest_streak_days": longest,
+        "current_streak_days": current,
+    }
+
+
+def _breakdown(totals: dict[str, list[float]]) -> list[dict]:
+    return [
+        {"key": key, "total_seconds": seconds, "entry_count": count}
+        for key, (seconds, count) in sorted(totals.items(), key=lambda item: -item[1][0])
+    ]
+
+
+def _session_percentiles(db: Session, filters, count: int) -> dict[str, float]:
+    """Nearest-rank percentiles of the durations of the ``count`` entries matching ``filters``."""
+    if not count:
+        return {f"p{p}": 0.0 for p in PERCENTILES}
+    if db.get_bind().dialect.name == "postgresql":
+        row = db.execute(
+            select(*(
+                func.percentile_disc(p / 100).within_group(TimeEntry.duration_seconds)
+                for p in PERCENTILES
+            )).where(*filters)
+        ).one()
+        return {f"p{p}": float(value or 0) for p, value in zip(PERCENTILES, row)}
+    percentiles = {}
+    for p in PERCENTILES:
+        rank = _nearest_rank(p, count)
+        # Count from whichever end is closer so the sorter keeps fewer rows.
+        if rank < count // 2:
+            order, offset = TimeEntry.duration_seconds.asc(), rank
+        else:
+            order, offset = TimeEntry.duration_seconds.desc(), count - 1 - rank
+        value = db.execute(
+            select(TimeEntry.duration_seconds).where(*filters).order_by(order).limit(1).offset(offset)
+        ).scalar()
+        percentiles[f"p{p}"] = float(value or 0)
+    return percentiles
+
+
+def _nearest_rank(p: int, count: int) -> int:
+    """0-based position of the ``p``th percentile among ``count`` sorted values."""
+    return max(math.ceil(p / 100 * count), 1) - 1
+
+
+def _streaks(days: list[date], last_day: date) -> tuple[int, int]:
+    """Longest run of consecutive active days, and the run ending on ``last_day``."""
+    longest = run = 0
+    previous = None
+    for day in days:
+        run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+        longest = max(longest, run)
+        previous = day
+    current = run if previous == last_day else 0
+    return longest, current
@@ -0,0 +1,225 @@
+"""Move old closed time entries out of ``time_entries`` into compressed segments.
+
+Archived entries are grouped per task and calendar month (UTC) into a
+``TimeEntrySegment`` whose payload is a zlib-compressed block of columns, and
+their durations are rolled up into ``TimeEntryDailyTotal`` so summaries never
+need to decompress anything. Run periodically with::
+
+    python -m app.archive --days 365
+"""
+
+import argparse
+import json
+import os
+import zlib
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, func
+from sqlalchemy.orm import Session, undefer
+
+from app.models import Task, TimeEntry, TimeEntryDailyTotal, TimeEntrySegment
+
+load_dotenv()
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+ARCHIVE_BATCH_SIZE = 5000
+
+_COLUMNS = ("id", "start_time", "end_time", "duration_seconds", "created_at")
+_TIME_COLUMNS = ("start_time", "end_time", "created_at")
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _encode(rows: list[dict]) -> bytes:
+    columns = {name: [row[name] for row in rows] for name in _COLUMNS}
+    for name in _TIME_COLUMNS:
+        columns[name] = [_as_utc(v).timestamp() for v in columns[name]]
+    return zlib.compress(json.dumps(columns, separators=(",", ":")).encode("utf-8"))
+
+
+def _decode(payload: bytes) -> list[dict]:
+    columns = json.loads(zlib.decompress(payload))
+    for name in _TIME_COLUMNS:
+        columns[name] = [datetime.fromtimestamp(v, tz=timezone.utc) for v in columns[name]]
+    return [dict(zip(_COLUMNS, values)) for values in zip(*(columns[name] for name in _COLUMNS))]
+
+
+def archive_time_entries(
+    db: Session,
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> int:
+    """Archive closed entries that started more than ``older_than_days`` ago.
+
+    Works in batches, committing after each, and returns the number of
+    entries moved. Rows are removed with a bulk delete so the sync change log
+    does not report archived history as deleted.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    archived = 0
+
+    while True:
+        entries = (
+            db.query(TimeEntry)
+            .filter(TimeEntry.end_time.isnot(None), TimeEntry.start_time < cutoff)
+            .order_by(TimeEntry.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not entries:
+            break
+
+        segments: dict[tuple[int, date], list[dict]] = defaultdict(list)
+        daily: dict[tuple[int, date], list[float]] = defaultdict(lambda: [0.0, 0])
+        for entry in entries:
+            start = _as_utc(entry.start_time)
+            row = {name: getattr(entry, name) for name in _COLUMNS}
+            segments[(entry.task_id, start.date().replace(day=1))].append(row)
+            totals = daily[(entry.task_id, start.date())]
+            totals[0] += entry.duration_seconds or 0
+            totals[1] += 1
+
+        for (task_id, period_start), rows in segments.items():
+            _append_to_segment(db, task_id, period_start, rows)
+        for (task_id, day), (seconds, count) in daily.items():
+            _add_to_daily_total(db, task_id, day, seconds, count)
+
+        db.execute(
+            delete(TimeEntry).where(TimeEntry.id.in_([e.id for e in entries])),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        for entry in entries:
+            db.expunge(entry)
+        archived += len(entries)
+
+    return archived
+
+
+def _append_to_segment(db: Session, task_id: int, period_start: date, rows: list[dict]) -> None:
+    segment = (
+        db.query(TimeEntrySegment)
+        .options(undefer(TimeEntrySegment.payload))
+        .filter(TimeEntrySegment.task_id == task_id, TimeEntrySegment.period_start == period_start)
+        .first()
+    )
+    if segment is None:
+        segment = TimeEntrySegment(task_id=task_id, period_start=period_start, entry_count=0, total_seconds=0)
+        db.add(segment)
+        existing = []
+    else:
+        existing = _decode(segment.payload)
+
+    merged = sorted(existing + rows, key=lambda r: _as_utc(r["start_time"]))
+    segment.payload = _encode(merged)
+    segment.entry_count = len(merged)
+    segment.total_seconds = sum((r["duration_seconds"] or 0) for r in merged)
+
+
+def _add_to_daily_total(db: Session, task_id: int, day: date, seconds: float, count: int) -> None:
+    total = (
+        db.query(TimeEntryDailyTotal)
+        .filter(TimeEntryDailyTotal.task_id == task_id, TimeEntryDailyTotal.day == day)
+        .first()
+    )
+    if total is None:
+        db.add(TimeEntryDailyTotal(task_id=task_id, day=day, total_seconds=seconds, entry_count=count))
+    else:
+        total.total_seconds += seconds
+        total.entry_count += count
+
+
+def archived_entries(
+    db: Session,
+    task_id: int,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> list[dict]:
+    """Decode archived entries for a task, optionally limited to a start time range."""
+    query = (
+        db.query(TimeEntrySegment)
+        .options(undefer(TimeEntrySegment.payload))
+        .filter(TimeEntrySegment.task_id == task_id)
+    )
+    if date_from is not None:
+        query = query.filter(TimeEntrySegment.period_start >= date_from.date().replace(day=1))
+    if date_to is not None:
+        query = query.filter(TimeEntrySegment.period_start < date_to.date())
+
+    rows = []
+    for segment in query.order_by(TimeEntrySegment.period_start.asc()).all():
+        for row in _decode(segment.payload):
+            if date_from is not None and row["start_time"] < _as_utc(date_from):
+                continue
+            if date_to is not None and row["start_time"] >= _as_utc(date_to):
+                continue
+            row["task_id"] = task_id
+            rows.append(row)
+    return rows
+
+
+def archived_seconds_by_task(db: Session, task_ids: list[int]) -> dict[int, float]:
+    if not task_ids:
+        return {}
+    rows = (
+        db.query(TimeEntrySegment.task_id, func.sum(TimeEntrySegment.total_seconds))
+        .filter(TimeEntrySegment.task_id.in_(task_ids))
+        .group_by(TimeEntrySegment.task_id)
+        .all()
+    )
+    return {task_id: seconds or 0.0 for task_id, seconds in rows}
+
+
+def archived_daily_totals(db: Session, user_id: int, date_from: datetime, date_to: datetime) -> list:
+    """Per-task archived totals for whole UTC days in ``[date_from, date_to)``."""
+    return (
+        db.query(
+            TimeEntryDailyTotal.task_id,
+            func.sum(TimeEntryDailyTotal.total_seconds).label("total_seconds"),
+            func.sum(TimeEntryDailyTotal.entry_count).label("entry_count"),
+        )
+        .join(Task, Task.id == TimeEntryDailyTotal.task_id)
+        .filter(
+            Task.user_id == user_id,
+            TimeEntryDailyTotal.day >= _as_utc(date_from).date(),
+            TimeEntryDailyTotal.day < _as_utc(date_to).date(),
+        )
+        .group_by(TimeEntryDailyTotal.task_id)
+        .all()
+    )
+
+
+def merge_entries(hot: list, archived: list[dict]) -> list:
+    """Combine live ORM entries with archived rows, newest first."""
+
+    def start_of(entry) -> datetime:
+        value = entry["start_time"] if isinstance(entry, dict) else entry.start_time
+        return _as_utc(value)
+
+    return sorted(list(hot) + archived, key=start_of, reverse=True)
+
+
+def main() -> None:
+    from app.database import WriteSessionLocal
+
+    parser = argparse.ArgumentParser(description="Archive old closed time entries.")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS, help="archive entries older than this")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = WriteSessionLocal()
+    try:
+        count = archive_time_entries(db, older_than_days=args.days, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Archived {count} time entries older than {args.days} days")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
 import os
+import re
+import threading
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 load_dotenv()
 
@@ -13,12 +16,128 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
-DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Connections per process: the admission limits are derived from this total.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_CAPACITY = DB_POOL_SIZE + DB_MAX_OVERFLOW
+
+# Seconds a write transaction waits for the SQLite writer slot before giving up.
+SQLITE_WRITE_TIMEOUT = float(os.getenv("SQLITE_WRITE_TIMEOUT", "10"))
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-65536",  # 64 MiB
+    "PRAGMA mmap_size=268435456",  # 256 MiB
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",
+)
+
+
+def build_database_url() -> str:
+    """``DATABASE_URL`` wins; otherwise build one from ``DB_DIALECT`` and ``DB_*``."""
+    url = os.getenv("DATABASE_URL")
+    if url:
+        return url
+    if DB_DIALECT == "sqlite":
+        return f"sqlite+pysqlite:///{DB_NAME or 'task_management.db'}"
+    return f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+
+def pool_arguments(url: str) -> dict:
+    """Pool sizing for ``create_engine``, only where the dialect pools with ``QueuePool``.
+
+    In-memory SQLite uses ``SingletonThreadPool``, which rejects these arguments.
+    """
+    parsed = make_url(url)
+    if not issubclass(parsed.get_dialect().get_pool_class(parsed), QueuePool):
+        return {}
+    return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW}
+
+
+DATABASE_URL = build_database_url()
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+if IS_SQLITE:
+    engine = create_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        **pool_arguments(DATABASE_URL),
+    )
+
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        # Let SQLAlchemy control BEGIN so write transactions can use IMMEDIATE.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _begin_sqlite(conn):
+        if conn.get_execution_options().get("sqlite_immediate"):
+            _acquire_writer(conn)
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            conn.exec_driver_sql("BEGIN")
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _claim_writer(conn, cursor, statement, parameters, context, executemany):
+        # Deferred transactions that turn out to write still queue for the
+        # slot. They keep their snapshot: if another writer committed since
+        # it was taken, SQLite refuses the write and _busy_sqlite reports it.
+        if not conn.info.get("sqlite_writer") and _WRITE_STATEMENT.match(statement):
+            _acquire_writer(conn)
+
+    @event.listens_for(engine, "handle_error")
+    def _busy_sqlite(context):
+        error = context.original_exception
+        if getattr(error, "sqlite_errorcode", 0) & 0xFF == _SQLITE_BUSY:
+            raise DatabaseBusyError("Database is busy, retry the request") from error
+
+    @event.listens_for(engine, "commit")
+    def _commit_sqlite(conn):
+        # End the transaction here so the writer slot is freed only after it.
+        conn.connection.dbapi_connection.commit()
+        _release_writer(conn)
+
+    @event.listens_for(engine, "rollback")
+    def _rollback_sqlite(conn):
+        conn.connection.dbapi_connection.rollback()
+        _release_writer(conn)
+else:
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True, **pool_arguments(DATABASE_URL))
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessions whose transactions take the SQLite writer slot before their first read.
+WriteSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine.execution_options(sqlite_immediate=True)
+)
 Base = declarative_base()
 
+# SQLite allows one writer at a time; write transactions queue here instead of
+# colliding inside SQLite and failing with "database is locked".
+_sqlite_write_lock = threading.Lock()
+_WRITE_STATEMENT = re.compile(r"\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|DROP|ALTER|SAVEPOINT)\b", re.IGNORECASE)
+_SQLITE_BUSY = 5
+
+
+class DatabaseBusyError(Exception):
+    """A write could not get the SQLite writer in time, or its snapshot went stale; retry it."""
+
+
+def _acquire_writer(conn) -> None:
+    if not _sqlite_write_lock.acquire(timeout=SQLITE_WRITE_TIMEOUT):
+        raise DatabaseBusyError("Timed out waiting for the SQLite writer slot")
+    conn.info["sqlite_writer"] = True
+
+
+def _release_writer(conn) -> None:
+    if conn.info.pop("sqlite_writer", False):
+        _sqlite_write_lock.release()
+
 
 def get_db():
     db = SessionLocal()
@@ -26,3 +145,4 @@ def get_db():
         yield db
     finally:
         db.close()
+
@@ -3,7 +3,7 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
 from app.auth import decode_access_token
-from app.database import get_db
+from app.database import IS_SQLITE, get_db
 from app.models import User
 
 security = HTTPBearer()
@@ -33,3 +33,21 @@ def get_current_user(
             detail="User not found",
         )
     return user
+
+
+def begin_write(db: Session) -> None:
+    """Open ``db``'s transaction for writing before its first read.
+
+    For handlers that read and then write (check a timer is not running, then
+    start one): on SQLite the writer slot is taken and ``BEGIN IMMEDIATE``
+    issued up front, so the check cannot go stale before the write.
+    """
+    if IS_SQLITE:
+        db.connection(execution_options={"sqlite_immediate": True})
+
+
+def get_write_db(db: Session = Depends(get_db)) -> Session:
+    """``get_db`` with ``begin_write`` applied. Declare it before
+    ``get_current_user`` so the user lookup runs in the same transaction."""
+    begin_write(db)
+    return db
@@ -0,0 +1,153 @@
+"""Content negotiation for API bodies.
+
+Responses are JSON by default. Clients may ask for MessagePack with
+``Accept: application/msgpack`` and for compressed bodies with
+``Accept-Encoding: br`` or ``gzip``; bodies smaller than
+``COMPRESS_MIN_SIZE`` bytes are sent uncompressed. Bulk endpoints also accept
+request bodies in these formats, see ``decode_stream``.
+"""
+
+import gzip
+import os
+import zlib
+from contextvars import ContextVar
+from typing import AsyncIterator
+
+import brotli
+import msgpack
+from dotenv import load_dotenv
+from fastapi.responses import JSONResponse
+
+load_dotenv()
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+# Largest block of decompressed request body produced at a time.
+DECOMPRESS_BLOCK_SIZE = 64 * 1024
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# Accept / Accept-Encoding of the request being handled.
+_accept: ContextVar[tuple[str, str]] = ContextVar("accept", default=("", ""))
+
+
+def wants_msgpack(accept: str) -> bool:
+    return any(media_type in accept for media_type in MSGPACK_TYPES)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Pick ``br`` or ``gzip`` from an Accept-Encoding header, honouring ``q=0``."""
+    offered = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip()] = q
+    for name in ("br", "gzip"):
+        if offered.get(name, offered.get("*", 0)) > 0:
+            return name
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=4)
+    return gzip.compress(body, compresslevel=5)
+
+
+class NegotiatedResponse(JSONResponse):
+    """JSONResponse that switches to MessagePack and compresses per the request headers."""
+
+    def __init__(self, content=None, status_code: int = 200, headers=None, media_type=None, background=None):
+        super().__init__(content, status_code, headers, media_type, background)
+        accept, accept_encoding = _accept.get()
+        self.headers["vary"] = "Accept, Accept-Encoding"
+        encoding = choose_encoding(accept_encoding)
+        if encoding and len(self.body) >= COMPRESS_MIN_SIZE:
+            self.body = compress(self.body, encoding)
+            self.headers["content-encoding"] = encoding
+            self.headers["content-length"] = str(len(self.body))
+
+    def render(self, content) -> bytes:
+        if wants_msgpack(_accept.get()[0]):
+            self.media_type = "application/msgpack"
+            return msgpack.packb(content, use_bin_type=True)
+        return super().render(content)
+
+
+class ContentNegotiationMiddleware:
+    """Expose the request's Accept headers to NegotiatedResponse."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        token = _accept.set((
+            headers.get(b"accept", b"").decode("latin-1").lower(),
+            headers.get(b"accept-encoding", b"").decode("latin-1"),
+        ))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _accept.reset(token)
+
+
+class BodyDecodeError(ValueError):
+    """A request body is corrupt or truncated for its Content-Encoding."""
+
+
+async def decode_stream(chunks: AsyncIterator[bytes], content_encoding: str) -> AsyncIterator[bytes]:
+    """Incrementally undo a request's gzip or br Content-Encoding.
+
+    Output comes in blocks of about ``DECOMPRESS_BLOCK_SIZE`` bytes however
+    well the input compresses, and a stream that ends before the compressed
+    data does raises ``BodyDecodeError``.
+    """
+    content_encoding = content_encoding.strip().lower()
+    if content_encoding in ("", "identity"):
+        async for chunk in chunks:
+            yield chunk
+        return
+    if content_encoding == "gzip":
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            async for chunk in chunks:
+                while chunk:
+                    if decompressor.eof:
+                        # Concatenated gzip members (RFC 1952): start the next one.
+                        yield decompressor.flush()
+                        decompressor = zlib.decompressobj(wbits=31)
+                    block = decompressor.decompress(chunk, DECOMPRESS_BLOCK_SIZE)
+                    if block:
+                        yield block
+                    chunk = decompressor.unconsumed_tail or decompressor.unused_data
+            yield decompressor.flush()
+        except zlib.error as exc:
+            raise BodyDecodeError(f"Invalid gzip body: {exc}") from None
+        if not decompressor.eof:
+            raise BodyDecodeError("Truncated gzip body")
+        return
+    if content_encoding == "br":
+        decompressor = brotli.Decompressor()
+        try:
+            async for chunk in chunks:
+                # Drain buffered output before feeding the next chunk.
+                while True:
+                    block = decompressor.process(chunk, output_buffer_limit=DECOMPRESS_BLOCK_SIZE)
+                    chunk = b""
+                    if block:
+                        yield block
+                    elif decompressor.can_accept_more_data():
+                        break
+        except brotli.error as exc:
+            raise BodyDecodeError(f"Invalid br body: {exc}") from None
+        if not decompressor.is_finished():
+            raise BodyDecodeError("Truncated br body")
+        return
+    raise ValueError(f"Unsupported Content-Encoding: {content_encoding}")
@@ -0,0 +1,364 @@
+"""Bulk import of historical time entries from other trackers.
+
+Uploads are CSV (header row required), NDJSON or a stream of MessagePack maps
+with the fields ``task_id`` or ``task_title``, ``start_time`` and ``end_time``
+(ISO 8601, UTC when no offset is given). Rows are parsed as the body streams in and loaded in chunks: each
+chunk is checked for ownership and overlaps with one query per concern, then
+written with COPY on PostgreSQL or a multi-row INSERT elsewhere.
+"""
+
+import codecs
+import csv
+import io
+import json
+import uuid
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+
+import msgpack
+from sqlalchemy import insert, or_, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.archive import archived_entries
+from app.models import ChangeLog, Task, TimeEntry, TimeEntryDailyTotal
+from app.sync import ENTITY_TIME_ENTRY, lock_change_log
+
+IMPORT_CHUNK_SIZE = 5000
+# Longest accepted CSV/NDJSON line or MessagePack record; bounds the memory a
+# single row can take while the body streams in.
+MAX_LINE_LENGTH = 64 * 1024
+MAX_REPORTED_ERRORS = 100
+_MAX_TRACKED_JOBS = 100
+_FOREVER = datetime.max.replace(tzinfo=timezone.utc)
+# Archived entries are looked up by start time; ones that started more than
+# this long before an imported row are assumed not to reach it.
+_ARCHIVE_LOOKBEHIND = timedelta(days=1)
+
+
+class ImportFormatError(ValueError):
+    """The upload cannot be read any further (as opposed to a single bad row)."""
+
+
+@dataclass
+class ImportProgress:
+    import_id: str
+    user_id: int
+    status: str = "running"
+    rows_read: int = 0
+    imported: int = 0
+    rejected: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def reject(self, line: int, message: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "message": message})
+
+
+# Keyed by (user_id, import_id): import ids are chosen by clients and only
+# need to be unique per user.
+_jobs: "OrderedDict[tuple[int, str], ImportProgress]" = OrderedDict()
+
+
+def start_job(user_id: int, import_id: str | None = None) -> ImportProgress:
+    job = ImportProgress(import_id=import_id or uuid.uuid4().hex, user_id=user_id)
+    key = (user_id, job.import_id)
+    _jobs.pop(key, None)
+    _jobs[key] = job
+    while len(_jobs) > _MAX_TRACKED_JOBS:
+        _jobs.popitem(last=False)
+    return job
+
+
+def get_job(user_id: int, import_id: str) -> ImportProgress | None:
+    return _jobs.get((user_id, import_id))
+
+
+def _check_line_length(length: int) -> None:
+    if length > MAX_LINE_LENGTH:
+        raise ImportFormatError(f"Line longer than {MAX_LINE_LENGTH} characters")
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split the body into lines, splitting each chunk once."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    # Pieces of a line that has not ended yet, and their total length.
+    pending: list[str] = []
+    pending_length = 0
+    async for chunk in chunks:
+        lines = decoder.decode(chunk).split("\n")
+        if len(lines) > 1:
+            pending.append(lines[0])
+            lines[0] = "".join(pending)
+            pending, pending_length = [], 0
+            for line in lines[:-1]:
+                _check_line_length(len(line))
+                yield line.rstrip("\r")
+        pending.append(lines[-1])
+        pending_length += len(lines[-1])
+        _check_line_length(pending_length)
+    pending.append(decoder.decode(b"", final=True))
+    line = "".join(pending)
+    if line:
+        yield line.rstrip("\r")
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[tuple[int, dict | None]]:
+    """Yield ``(line_number, record)``; record is None when the line cannot be parsed.
+
+    CSV quoted fields may not span lines. For MessagePack the "line" is the
+    position of the map in the stream.
+    """
+    if fmt == "msgpack":
+        unpacker = msgpack.Unpacker(raw=False, max_buffer_size=2 * MAX_LINE_LENGTH)
+        position = 0
+        async for chunk in chunks:
+            for offset in range(0, len(chunk), MAX_LINE_LENGTH):
+                try:
+                    unpacker.feed(chunk[offset:offset + MAX_LINE_LENGTH])
+                except msgpack.BufferFull:
+                    raise ImportFormatError(f"Record larger than {MAX_LINE_LENGTH} bytes") from None
+                for record in unpacker:
+                    position += 1
+                    yield position, record if isinstance(record, dict) else None
+        return
+
+    header = None
+    line_no = 0
+    async for line in iter_lines(chunks):
+        line_no += 1
+        if not line.strip():
+            continue
+        if fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_no, record if isinstance(record, dict) else None
+            continue
+        values = next(csv.reader(io.StringIO(line)))
+        if header is None:
+            header = [v.strip() for v in values]
+            continue
+        yield line_no, dict(zip(header, values)) if len(values) == len(header) else None
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _parse_time(value) -> datetime:
+    return _as_utc(datetime.fromisoformat(str(value).strip().replace("Z", "+00:00")))
+
+
+class TimeEntryImporter:
+    def __init__(self, session_factory: sessionmaker, job: ImportProgress, create_missing_tasks: bool = False):
+        self.session_factory = session_factory
+        self.job = job
+        self.create_missing_tasks = create_missing_tasks
+        self._titles: dict[str, int] = {}
+        self._owned_ids: set[int] = set()
+
+    def load_batch(self, batch: list[tuple[int, dict | None]]) -> None:
+        """Validate and insert one chunk of parsed records in its own session and transaction.
+
+        No connection (or, on SQLite, the writer slot) is held between chunks,
+        so a slow upload does not block other requests.
+        """
+        with self.session_factory() as db:
+            rows = self._validate(db, batch)
+            rows = self._drop_overlaps(db, rows)
+            if rows:
+                lock_change_log(db.connection(), [self.job.user_id])
+                ids = self._insert(db, rows)
+                db.execute(
+                    insert(ChangeLog),
+                    [{"user_id": self.job.user_id, "entity_type": ENTITY_TIME_ENTRY, "entity_id": i} for i in ids],
+                )
+            db.commit()
+        self.job.imported += len(rows)
+
+    def _validate(self, db: Session, batch: list[tuple[int, dict | None]]) -> list[dict]:
+        self._resolve_tasks(db, batch)
+        rows = []
+        for line, record in batch:
+            self.job.rows_read += 1
+            if record is None:
+                self.job.reject(line, "Unparseable row")
+                continue
+            try:
+                start = _parse_time(record["start_time"])
+                end = _parse_time(record["end_time"])
+            except (KeyError, TypeError, ValueError):
+                self.job.reject(line, "start_time and end_time must be ISO 8601 timestamps")
+                continue
+            if end <= start:
+                self.job.reject(line, "end_time must be after start_time")
+                continue
+            task_id = self._task_id_for(record)
+            if task_id is None:
+                self.job.reject(line, "Unknown task")
+                continue
+            rows.append({
+                "line": line,
+                "task_id": task_id,
+                "start_time": start,
+                "end_time": end,
+                "duration_seconds": (end - start).total_seconds(),
+            })
+        return rows
+
+    def _resolve_tasks(self, db: Session, batch: list[tuple[int, dict | None]]) -> None:
+        """Load ids and titles referenced by this chunk in two queries."""
+        ids, titles = set(), set()
+        for _, record in batch:
+            if not record:
+                continue
+            if record.get("task_id") not in (None, ""):
+                try:
+                    ids.add(int(record["task_id"]))
+                except (TypeError, ValueError):
+                    pass
+            elif record.get("task_title"):
+                titles.add(str(record["task_title"]).strip())
+
+        ids -= self._owned_ids
+        if ids:
+            owned = db.execute(
+                select(Task.id).where(Task.id.in_(ids), Task.user_id == self.job.user_id)
+            ).scalars()
+            self._owned_ids.update(owned)
+
+        titles -= self._titles.keys()
+        if titles:
+            found = db.execute(
+                select(Task.title, Task.id)
+                .where(Task.title.in_(titles), Task.user_id == self.job.user_id)
+                .order_by(Task.id.asc())
+            ).all()
+            for title, task_id in found:
+                self._titles.setdefault(title, task_id)
+            if self.create_missing_tasks:
+                for title in sorted(titles - self._titles.keys()):
+                    task = Task(title=title[:255], user_id=self.job.user_id)
+                    db.add(task)
+                    db.flush()
+                    self._titles[title] = task.id
+            self._owned_ids.update(self._titles.values())
+
+    def _task_id_for(self, record: dict) -> int | None:
+        if record.get("task_id") not in (None, ""):
+            try:
+                task_id = int(record["task_id"])
+            except (TypeError, ValueError):
+                return None
+            return task_id if task_id in self._owned_ids else None
+        return self._titles.get(str(record.get("task_title") or "").strip())
+
+    def _drop_overlaps(self, db: Session, rows: list[dict]) -> list[dict]:
+        """Reject rows overlapping another row of the chunk or a stored entry of the same task.
+
+        Stored entries include archived ones, so re-importing a file after the
+        archive job ran does not bring archived entries back as duplicates.
+        """
+        if not rows:
+            return rows
+        by_task: dict[int, list[dict]] = defaultdict(list)
+        for row in rows:
+            by_task[row["task_id"]].append(row)
+
+        existing: dict[int, list[tuple[datetime, datetime]]] = defaultdict(list)
+        stored = db.execute(
+            select(TimeEntry.task_id, TimeEntry.start_time, TimeEntry.end_time).where(
+                TimeEntry.task_id.in_(by_task.keys()),
+                TimeEntry.start_time < max(r["end_time"] for r in rows),
+                or_(TimeEntry.end_time.is_(None), TimeEntry.end_time > min(r["start_time"] for r in rows)),
+            )
+        )
+        for task_id, start, end in stored:
+            # A running timer blocks everything after its start.
+            existing[task_id].append((_as_utc(start), _as_utc(end) if end else _FOREVER))
+        for task_id, start, end in self._archived_intervals(db, by_task):
+            existing[task_id].append((start, end))
+
+        accepted = []
+        for task_id, task_rows in by_task.items():
+            intervals = sorted(existing[task_id])
+            starts = [start for start, _ in intervals]
+            # reach[i] is the latest end among the first i + 1 stored intervals.
+            reach, latest = [], None
+            for _, end in intervals:
+                latest = end if latest is None else max(latest, end)
+                reach.append(latest)
+
+            last_end = None
+            for row in sorted(task_rows, key=lambda r: r["start_time"]):
+                before = bisect_left(starts, row["end_time"])
+                clashes = before > 0 and reach[before - 1] > row["start_time"]
+                if clashes or (last_end is not None and row["start_time"] < last_end):
+                    self.job.reject(row["line"], "Overlaps another time entry for this task")
+                    continue
+                accepted.append(row)
+                last_end = row["end_time"]
+        return accepted
+
+    def _archived_intervals(self, db: Session, by_task: dict[int, list[dict]]):
+        """Yield ``(task_id, start, end)`` of archived entries near the chunk's rows.
+
+        Daily totals show which tasks have archived history in range, so
+        segments are only decoded for those.
+        """
+        windows = {
+            task_id: (
+                min(r["start_time"] for r in task_rows) - _ARCHIVE_LOOKBEHIND,
+                max(r["end_time"] for r in task_rows),
+            )
+            for task_id, task_rows in by_task.items()
+        }
+        archived_tasks = db.execute(
+            select(TimeEntryDailyTotal.task_id).distinct().where(
+                TimeEntryDailyTotal.task_id.in_(windows.keys()),
+                TimeEntryDailyTotal.day >= min(start for start, _ in windows.values()).date(),
+                TimeEntryDailyTotal.day <= max(end for _, end in windows.values()).date(),
+            )
+        ).scalars()
+        for task_id in archived_tasks:
+            for row in archived_entries(db, task_id, *windows[task_id]):
+                yield task_id, row["start_time"], row["end_time"]
+
+    def _insert(self, db: Session, rows: list[dict]) -> list[int]:
+        values = [{k: v for k, v in row.items() if k != "line"} for row in rows]
+        if db.get_bind().dialect.name == "postgresql":
+            return self._copy(db, values)
+        result = db.execute(
+            insert(TimeEntry).returning(TimeEntry.id, sort_by_parameter_order=True), values
+        )
+        return list(result.scalars())
+
+    def _copy(self, db: Session, values: list[dict]) -> list[int]:
+        # Reserve ids up front so the change log can reference COPYed rows.
+        ids = list(db.execute(
+            text("SELECT nextval(pg_get_serial_sequence('time_entries', 'id')) FROM generate_series(1, :n)"),
+            {"n": len(values)},
+        ).scalars())
+        buffer = io.StringIO()
+        for entry_id, row in zip(ids, values):
+            buffer.write(
+                f"{entry_id}\t{row['task_id']}\t{row['start_time'].isoformat()}\t"
+                f"{row['end_time'].isoformat()}\t{row['duration_seconds']}\n"
+            )
+        buffer.seek(0)
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                "COPY time_entries (id, task_id, start_time, end_time, duration_seconds) FROM STDIN",
+                buffer,
+            )
+        finally:
+            cursor.close()
+        return ids
@@ -1,22 +1,34 @@
 import os
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 
-from app.database import Base, engine
+from app.admission import AdmissionControlMiddleware, build_limiters
+from app.database import DatabaseBusyError, engine
+from app.encoding import ContentNegotiationMiddleware, NegotiatedResponse
+from app.routes.analytics import router as analytics_router
 from app.routes.auth import router as auth_router
+from app.routes.imports import router as imports_router
+from app.routes.sync import router as sync_router
 from app.routes.tasks import router as tasks_router
 from app.routes.time_entries import router as time_entries_router
 from app.routes.time_entries import time_router
+from app.schema import upgrade_schema
 
 load_dotenv()
 
-Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
 
-app = FastAPI(title="Task Time Tracking App", version="1.0.0")
+app = FastAPI(title="Task Time Tracking App", version="1.0.0", default_response_class=NegotiatedResponse)
+
+app.add_middleware(ContentNegotiationMiddleware)
+
+# Added before CORS so shed (503) responses still carry CORS headers.
+admission_limiters = build_limiters()
+app.add_middleware(AdmissionControlMiddleware, limiters=admission_limiters)
 
 app.add_middleware(
     CORSMiddleware,
@@ -27,15 +39,30 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(DatabaseBusyError)
+async def database_busy(request: Request, exc: DatabaseBusyError):
+    return JSONResponse(
+        status_code=503, content={"detail": "Database busy, retry later"}, headers={"Retry-After": "1"}
+    )
+
+
 @app.get("/api/health")
 def health():
     return {"status": "ok"}
 
 
+@app.get("/api/health/admission")
+def admission_health():
+    return {name: limiter.stats() for name, limiter in admission_limiters.items()}
+
+
 app.include_router(auth_router)
 app.include_router(tasks_router)
 app.include_router(time_entries_router)
 app.include_router(time_router)
+app.include_router(sync_router)
+app.include_router(imports_router)
+app.include_router(analytics_router)
 
 # Serve React static build
 static_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
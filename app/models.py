@@ -1,5 +1,17 @@
-from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Integer, String, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.orm import deferred, relationship
 
 from app.database import Base
 
@@ -31,10 +43,19 @@ class Task(Base):
 
     owner = relationship("User", back_populates="tasks")
     time_entries = relationship("TimeEntry", back_populates="task", cascade="all, delete-orphan")
+    archived_segments = relationship("TimeEntrySegment", cascade="all, delete-orphan")
+    daily_totals = relationship("TimeEntryDailyTotal", cascade="all, delete-orphan")
 
 
 class TimeEntry(Base):
     __tablename__ = "time_entries"
+    # Covers range scans by task and start time, including analytics aggregates.
+    # AUTOINCREMENT stops SQLite from reusing the ids of archived entries, which
+    # still appear in API responses and the sync change log.
+    __table_args__ = (
+        Index("ix_time_entries_task_id_start_time", "task_id", "start_time", "end_time", "duration_seconds"),
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
@@ -42,5 +63,47 @@ class TimeEntry(Base):
     end_time = Column(DateTime(timezone=True), nullable=True)
     duration_seconds = Column(Float, nullable=True)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     task = relationship("Task", back_populates="time_entries")
+
+
+class TimeEntrySegment(Base):
+    """One task's archived time entries for a month, stored as a compressed column block."""
+
+    __tablename__ = "time_entry_segments"
+    __table_args__ = (UniqueConstraint("task_id", "period_start", name="uq_time_entry_segments_task_period"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False, index=True)
+    period_start = Column(Date, nullable=False)
+    entry_count = Column(Integer, nullable=False, default=0)
+    total_seconds = Column(Float, nullable=False, default=0)
+    payload = deferred(Column(LargeBinary, nullable=False))
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class TimeEntryDailyTotal(Base):
+    """Per-task daily rollup of archived time entries, used by summaries."""
+
+    __tablename__ = "time_entry_daily_totals"
+    __table_args__ = (UniqueConstraint("task_id", "day", name="uq_time_entry_daily_totals_task_day"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    day = Column(Date, nullable=False, index=True)
+    total_seconds = Column(Float, nullable=False, default=0)
+    entry_count = Column(Integer, nullable=False, default=0)
+
+
+class ChangeLog(Base):
+    """Append-only record of task/time entry writes; its id is the sync token."""
+
+    __tablename__ = "change_log"
+    __table_args__ = (Index("ix_change_log_user_id_id", "user_id", "id"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,31 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.analytics import compute_analytics
+from app.database import get_db
+from app.deps import get_current_user
+from app.models import User
+from app.schemas import AnalyticsResponse
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+
+@router.get("", response_model=AnalyticsResponse)
+def get_analytics(
+    start_date: Optional[date] = Query(default=None),
+    end_date: Optional[date] = Query(default=None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Productivity stats for ``start_date``..``end_date`` (inclusive, UTC); defaults to the last 30 days."""
+    end_date = end_date or datetime.now(timezone.utc).date()
+    start_date = start_date or end_date - timedelta(days=29)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    date_from = datetime.combine(start_date, time.min, tzinfo=timezone.utc)
+    date_to = datetime.combine(end_date, time.min, tzinfo=timezone.utc) + timedelta(days=1)
+    return compute_analytics(db, current_user.id, date_from, date_to)
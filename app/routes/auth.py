@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 
 from app.auth import create_access_token, hash_password, verify_password
 from app.database import get_db
-from app.deps import get_current_user
+from app.deps import begin_write, get_current_user
 from app.models import User
 from app.schemas import TokenResponse, UserLogin, UserRegister, UserResponse
 
@@ -12,6 +12,9 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 def register(payload: UserRegister, db: Session = Depends(get_db)):
+    # Hash before opening the write transaction so it is not held while hashing.
+    hashed_password = hash_password(payload.password)
+    begin_write(db)
     existing_user = db.query(User).filter(
         (User.username == payload.username) | (User.email == payload.email)
     ).first()
@@ -23,7 +26,7 @@ def register(payload: UserRegister, db: Session = Depends(get_db)):
     user = User(
         username=payload.username,
         email=payload.email,
-        hashed_password=hash_password(payload.password),
+        hashed_password=hashed_password,
     )
     db.add(user)
     db.commit()
@@ -0,0 +1,85 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.database import WriteSessionLocal, get_db
+from app.deps import get_current_user
+from app.encoding import MSGPACK_TYPES, BodyDecodeError, decode_stream
+from app.importer import (
+    IMPORT_CHUNK_SIZE,
+    ImportFormatError,
+    TimeEntryImporter,
+    get_job,
+    iter_records,
+    start_job,
+)
+from app.models import User
+from app.schemas import ImportProgressResponse
+
+router = APIRouter(prefix="/api/import", tags=["import"])
+
+
+@router.post("/time-entries", response_model=ImportProgressResponse)
+async def import_time_entries(
+    request: Request,
+    import_id: Optional[str] = Query(default=None, max_length=64),
+    create_missing_tasks: bool = Query(default=False),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Import historical time entries from a streamed CSV, NDJSON or MessagePack body.
+
+    The body may be gzip or br compressed (``Content-Encoding``). Pass ``import_id`` to poll ``GET /api/import/{import_id}`` for progress
+    while the upload is running.
+    """
+    content_type = request.headers.get("content-type", "").lower()
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        fmt = "ndjson"
+    elif "csv" in content_type:
+        fmt = "csv"
+    elif any(media_type in content_type for media_type in MSGPACK_TYPES):
+        fmt = "msgpack"
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv, application/x-ndjson or application/msgpack",
+        )
+    content_encoding = request.headers.get("content-encoding", "")
+    if content_encoding.strip().lower() not in ("", "identity", "gzip", "br"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported Content-Encoding: {content_encoding}",
+        )
+
+    job = start_job(current_user.id, import_id)
+    # Free the connection used for authentication; each chunk opens its own
+    # session inside the worker thread instead of holding one for the upload.
+    await run_in_threadpool(db.close)
+    importer = TimeEntryImporter(WriteSessionLocal, job, create_missing_tasks=create_missing_tasks)
+    batch = []
+    try:
+        async for record in iter_records(decode_stream(request.stream(), content_encoding), fmt):
+            batch.append(record)
+            if len(batch) >= IMPORT_CHUNK_SIZE:
+                await run_in_threadpool(importer.load_batch, batch)
+                batch = []
+        if batch:
+            await run_in_threadpool(importer.load_batch, batch)
+    except (BodyDecodeError, ImportFormatError) as exc:
+        job.status = "failed"
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except Exception:
+        job.status = "failed"
+        raise
+    job.status = "completed"
+    return job
+
+
+@router.get("/{import_id}", response_model=ImportProgressResponse)
+def get_import(import_id: str, current_user: User = Depends(get_current_user)):
+    job = get_job(current_user.id, import_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Import not found")
+    return job
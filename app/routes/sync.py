@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.archive import archived_seconds_by_task
+from app.database import get_db
+from app.deps import get_current_user
+from app.models import User
+from app.routes.tasks import _build_task_response
+from app.schemas import SyncResponse
+from app.sync import collect_changes
+
+router = APIRouter(prefix="/api/sync", tags=["sync"])
+
+
+@router.get("", response_model=SyncResponse)
+def sync(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    changes = collect_changes(db, current_user.id, since=since, limit=limit)
+    archived = archived_seconds_by_task(db, [t.id for t in changes["tasks"]])
+    changes["tasks"] = [_build_task_response(t, archived.get(t.id, 0.0)) for t in changes["tasks"]]
+    return changes
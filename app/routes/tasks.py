@@ -3,17 +3,18 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
+from app.archive import archived_seconds_by_task
 from app.database import get_db
-from app.deps import get_current_user
+from app.deps import get_current_user, get_write_db
 from app.models import Task, TimeEntry, User
 from app.schemas import TaskCreate, TaskResponse, TaskUpdate, TaskWithEntries
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
 
-def _build_task_response(task: Task) -> dict:
+def _build_task_response(task: Task, archived_seconds: float = 0.0) -> dict:
     """Build task response with computed time tracking fields."""
-    total_seconds = sum(
+    total_seconds = archived_seconds + sum(
         (e.duration_seconds or 0) for e in task.time_entries
     )
     active_entry = next(
@@ -38,7 +39,7 @@ def _build_task_response(task: Task) -> dict:
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 def create_task(
     payload: TaskCreate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     task = Task(
@@ -68,7 +69,8 @@ def list_tasks(
     if priority:
         query = query.filter(Task.priority == priority)
     tasks = query.order_by(Task.created_at.desc()).all()
-    return [_build_task_response(t) for t in tasks]
+    archived = archived_seconds_by_task(db, [t.id for t in tasks])
+    return [_build_task_response(t, archived.get(t.id, 0.0)) for t in tasks]
 
 
 @router.get("/{task_id}", response_model=TaskWithEntries)
@@ -80,7 +82,10 @@ def get_task(
     task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    resp = _build_task_response(task)
+    archived = archived_seconds_by_task(db, [task.id])
+    resp = _build_task_response(task, archived.get(task.id, 0.0))
+    # Archived entries are only counted in the totals; list them through
+    # GET /api/tasks/{id}/time-entries with a date range.
     resp["time_entries"] = task.time_entries
     return resp
 
@@ -89,7 +94,7 @@ def get_task(
 def update_task(
     task_id: int,
     payload: TaskUpdate,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
@@ -102,13 +107,14 @@ def update_task(
 
     db.commit()
     db.refresh(task)
-    return _build_task_response(task)
+    archived = archived_seconds_by_task(db, [task.id])
+    return _build_task_response(task, archived.get(task.id, 0.0))
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
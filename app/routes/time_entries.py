@@ -4,8 +4,9 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
+from app.archive import archived_daily_totals, archived_entries, merge_entries
 from app.database import get_db
-from app.deps import get_current_user
+from app.deps import get_current_user, get_write_db
 from app.models import Task, TimeEntry, User
 from app.schemas import (
     PeriodSummary,
@@ -21,7 +22,7 @@ router = APIRouter(prefix="/api/tasks", tags=["time-tracking"])
 @router.post("/{task_id}/start", response_model=TimerStartResponse)
 def start_timer(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
@@ -46,7 +47,7 @@ def start_timer(
 @router.post("/{task_id}/stop", response_model=TimerStopResponse)
 def stop_timer(
     task_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_write_db),
     current_user: User = Depends(get_current_user),
 ):
     task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
@@ -80,20 +81,36 @@ def stop_timer(
 @router.get("/{task_id}/time-entries", response_model=list[TimeEntryResponse])
 def list_time_entries(
     task_id: int,
+    start_date: Optional[str] = Query(default=None),
+    end_date: Optional[str] = Query(default=None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    """Entries of a task, newest first, optionally limited to start days in [start_date, end_date].
+
+    Archived entries are merged in only when ``start_date`` is given, and only
+    the archive segments overlapping the range are read.
+    """
     task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    try:
+        date_from = datetime.fromisoformat(start_date).replace(tzinfo=timezone.utc) if start_date else None
+        date_to = (
+            datetime.fromisoformat(end_date).replace(tzinfo=timezone.utc) + timedelta(days=1) if end_date else None
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start_date and end_date must be ISO dates")
 
-    entries = (
-        db.query(TimeEntry)
-        .filter(TimeEntry.task_id == task_id)
-        .order_by(TimeEntry.start_time.desc())
-        .all()
-    )
-    return entries
+    query = db.query(TimeEntry).filter(TimeEntry.task_id == task_id)
+    if date_from is not None:
+        query = query.filter(TimeEntry.start_time >= date_from)
+    if date_to is not None:
+        query = query.filter(TimeEntry.start_time < date_to)
+    entries = query.order_by(TimeEntry.start_time.desc()).all()
+    if date_from is None:
+        return entries
+    return merge_entries(entries, archived_entries(db, task_id, date_from, date_to))
 
 
 # ── Summary / Filter Endpoint ─────────────────────────────────
@@ -161,6 +178,20 @@ def get_time_summary(
         task_map[entry.task_id]["total_seconds"] += dur
         task_map[entry.task_id]["entry_count"] += 1
 
+    # Archived entries only survive as daily totals; summary ranges are whole days.
+    for row in archived_daily_totals(db, current_user.id, date_from, date_to):
+        total_seconds += row.total_seconds
+        if row.task_id not in task_map:
+            task = db.query(Task).filter(Task.id == row.task_id).first()
+            task_map[row.task_id] = {
+                "task_id": row.task_id,
+                "task_title": task.title if task else "Unknown",
+                "total_seconds": 0,
+                "entry_count": 0,
+            }
+        task_map[row.task_id]["total_seconds"] += row.total_seconds
+        task_map[row.task_id]["entry_count"] += row.entry_count
+
     return PeriodSummary(
         period=period,
         start_date=date_from.isoformat(),
@@ -0,0 +1,41 @@
+"""Bring the database schema up to date with the models.
+
+``create_all`` only creates missing tables. Columns and indexes added to
+existing tables since an install was created are added here, so an upgraded
+app can start against an older database.
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateColumn
+
+from app import models  # noqa: F401  (registers the tables on Base.metadata)
+from app.database import Base
+
+
+def upgrade_schema(bind: Engine) -> None:
+    """Create missing tables, then missing columns and indexes on existing ones."""
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    _add_column(conn, table, column)
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+def _add_column(conn, table, column) -> None:
+    if conn.dialect.name != "sqlite" or column.server_default is None:
+        ddl = CreateColumn(column).compile(dialect=conn.dialect)
+        conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+        return
+    # SQLite cannot add a column with a non-constant default such as
+    # CURRENT_TIMESTAMP to a table that has rows: add it bare, then backfill
+    # timestamps from created_at.
+    ddl = f"{column.name} {column.type.compile(dialect=conn.dialect)}"
+    conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {ddl}")
+    if "created_at" in table.c.keys() and column.name != "created_at":
+        conn.exec_driver_sql(f"UPDATE {table.name} SET {column.name} = created_at")
@@ -61,6 +61,7 @@ class TimeEntryResponse(BaseModel):
     end_time: Optional[datetime] = None
     duration_seconds: Optional[float] = None
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -109,3 +110,58 @@ class PeriodSummary(BaseModel):
     end_date: str
     total_seconds: float
     task_summaries: list[TaskTimeSummary]
+
+
+# ── Sync Schemas ──────────────────────────────────────────────
+
+class SyncResponse(BaseModel):
+    token: int
+    has_more: bool = False
+    tasks: list[TaskResponse]
+    time_entries: list[TimeEntryResponse]
+    deleted_task_ids: list[int]
+    deleted_time_entry_ids: list[int]
+
+
+# ── Import Schemas ────────────────────────────────────────────
+
+class ImportRowError(BaseModel):
+    line: int
+    message: str
+
+
+class ImportProgressResponse(BaseModel):
+    import_id: str
+    status: str
+    rows_read: int
+    imported: int
+    rejected: int
+    errors: list[ImportRowError]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ── Analytics Schemas ─────────────────────────────────────────
+
+class AnalyticsBreakdown(BaseModel):
+    key: str
+    total_seconds: float
+    entry_count: int
+
+
+class AnalyticsResponse(BaseModel):
+    start_date: date
+    end_date: date
+    total_seconds: float
+    entry_count: int
+    average_session_seconds: float
+    session_percentiles: dict[str, float]
+    # Entries the percentiles are computed from; archived ones are not included.
+    session_percentiles_entry_count: int
+    by_priority: list[AnalyticsBreakdown]
+    by_status: list[AnalyticsBreakdown]
+    overdue_seconds: float
+    overdue_task_count: int
+    active_days: int
+    longest_streak_days: int
+    current_streak_days: int
@@ -0,0 +1,114 @@
+from sqlalchemy import event, func, insert, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import ChangeLog, Task, TimeEntry
+
+ENTITY_TASK = "task"
+ENTITY_TIME_ENTRY = "time_entry"
+
+# First key of the per-user advisory lock guarding change log writes.
+_CHANGE_LOG_LOCK = 26
+
+
+def lock_change_log(connection: Connection, user_ids) -> None:
+    """Serialise change log writers per user until their transaction ends.
+
+    PostgreSQL hands out sequence ids at insert time, not at commit, so without
+    this a later id could become visible before an earlier one and a client
+    syncing in between would skip the earlier change for good. Holding a
+    transaction-scoped lock from id allocation to commit keeps each user's
+    change ids visible in order. SQLite already allows a single writer.
+    """
+    if connection.dialect.name != "postgresql":
+        return
+    for user_id in sorted(set(user_ids)):
+        connection.execute(
+            text("SELECT pg_advisory_xact_lock(:key, :user_id)"),
+            {"key": _CHANGE_LOG_LOCK, "user_id": user_id},
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _record_changes(session: Session, flush_context) -> None:
+    """Append a change log row for every task/time entry touched by the flush."""
+    touched = list(session.new) + list(session.dirty) + list(session.deleted)
+
+    # Entries deleted together with their task can no longer resolve the owner
+    # through the tasks table, so remember owners of tasks seen in this flush.
+    task_owners = {obj.id: obj.user_id for obj in touched if isinstance(obj, Task)}
+
+    connection = session.connection()
+    unknown = {obj.task_id for obj in touched if isinstance(obj, TimeEntry)} - task_owners.keys()
+    if unknown:
+        task_owners.update(connection.execute(select(Task.id, Task.user_id).where(Task.id.in_(unknown))).all())
+
+    rows = []
+    for obj in touched:
+        if isinstance(obj, Task):
+            rows.append({"user_id": obj.user_id, "entity_type": ENTITY_TASK, "entity_id": obj.id})
+        elif isinstance(obj, TimeEntry) and task_owners.get(obj.task_id) is not None:
+            rows.append(
+                {"user_id": task_owners[obj.task_id], "entity_type": ENTITY_TIME_ENTRY, "entity_id": obj.id}
+            )
+    if not rows:
+        return
+
+    lock_change_log(connection, [row["user_id"] for row in rows])
+    connection.execute(insert(ChangeLog), rows)
+
+
+def collect_changes(db: Session, user_id: int, since: int = 0, limit: int = 500) -> dict:
+    """Return tasks and time entries changed after ``since`` plus deleted ids.
+
+    Changes are collapsed to the latest one per entity, so a row written many
+    times is sent once. The returned token is the log id of the last change
+    included; pass it back as ``since`` to continue. Change ids become visible
+    in order (see ``lock_change_log``), so the token never passes a change
+    that is still uncommitted.
+    """
+    latest = (
+        db.query(
+            ChangeLog.entity_type,
+            ChangeLog.entity_id,
+            func.max(ChangeLog.id).label("change_id"),
+        )
+        .filter(ChangeLog.user_id == user_id, ChangeLog.id > since)
+        .group_by(ChangeLog.entity_type, ChangeLog.entity_id)
+        .order_by(func.max(ChangeLog.id).asc())
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(latest) > limit
+    latest = latest[:limit]
+
+    task_ids = [r.entity_id for r in latest if r.entity_type == ENTITY_TASK]
+    entry_ids = [r.entity_id for r in latest if r.entity_type == ENTITY_TIME_ENTRY]
+
+    tasks = []
+    if task_ids:
+        tasks = (
+            db.query(Task)
+            .options(selectinload(Task.time_entries))
+            .filter(Task.id.in_(task_ids), Task.user_id == user_id)
+            .all()
+        )
+    entries = []
+    if entry_ids:
+        entries = (
+            db.query(TimeEntry)
+            .join(Task, Task.id == TimeEntry.task_id)
+            .filter(TimeEntry.id.in_(entry_ids), Task.user_id == user_id)
+            .all()
+        )
+
+    live_task_ids = {t.id for t in tasks}
+    live_entry_ids = {e.id for e in entries}
+    return {
+        "token": latest[-1].change_id if latest else since,
+        "has_more": has_more,
+        "tasks": tasks,
+        "time_entries": entries,
+        "deleted_task_ids": [i for i in task_ids if i not in live_task_ids],
+        "deleted_time_entry_ids": [i for i in entry_ids if i not in live_entry_ids],
+    }
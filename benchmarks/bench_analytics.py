@@ -0,0 +1,106 @@
+"""Latency of the analytics query over a large seeded dataset.
+
+Seeds one user with ``--entries`` closed time entries spread over three years
+into the database at DATABASE_URL (use an empty one), then times
+``compute_analytics`` for a 30 day, one year and full range::
+
+    DATABASE_URL=sqlite+pysqlite:///bench.db python benchmarks/bench_analytics.py
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.analytics import compute_analytics  # noqa: E402
+from app.database import DATABASE_URL, Base, SessionLocal, engine  # noqa: E402
+from app.models import Task, TimeEntry, User  # noqa: E402
+
+DAYS = 3 * 365
+
+
+def seed(entries: int, tasks: int, end: datetime) -> int:
+    rng = random.Random(42)
+    db = SessionLocal()
+    try:
+        user = User(username=f"bench-{time.time_ns()}", email=f"{time.time_ns()}@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        task_rows = [
+            Task(
+                title=f"Task {i}",
+                priority=("low", "medium", "high")[i % 3],
+                status=("pending", "in_progress", "done")[i % 3],
+                due_date=(end - timedelta(days=rng.randrange(DAYS))).date() if i % 2 else None,
+                user_id=user.id,
+            )
+            for i in range(tasks)
+        ]
+        db.add_all(task_rows)
+        db.commit()
+        task_ids = [t.id for t in task_rows]
+
+        start = end - timedelta(days=DAYS)
+        chunk = []
+        for _ in range(entries):
+            begin = start + timedelta(seconds=rng.randrange(DAYS * 86400))
+            duration = rng.randrange(60, 4 * 3600)
+            chunk.append({
+                "task_id": rng.choice(task_ids),
+                "start_time": begin,
+                "end_time": begin + timedelta(seconds=duration),
+                "duration_seconds": float(duration),
+            })
+            if len(chunk) == 50000:
+                db.execute(insert(TimeEntry), chunk)
+                db.commit()
+                chunk = []
+        if chunk:
+            db.execute(insert(TimeEntry), chunk)
+            db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    today = datetime.combine(date.today(), datetime.min.time(), tzinfo=timezone.utc) + timedelta(days=1)
+    started = time.perf_counter()
+    user_id = seed(args.entries, args.tasks, today)
+    print(f"database: {DATABASE_URL.split('://')[0]}")
+    print(f"seeded {args.entries} entries in {time.perf_counter() - started:.1f}s")
+
+    db = SessionLocal()
+    try:
+        for label, days in (("30 days", 30), ("1 year", 365), ("3 years", DAYS)):
+            timings = []
+            for _ in range(args.repeat):
+                began = time.perf_counter()
+                stats = compute_analytics(db, user_id, today - timedelta(days=days), today)
+                timings.append((time.perf_counter() - began) * 1000)
+            print(
+                f"{label:<8} entries={stats['entry_count']:>8}  "
+                f"median={statistics.median(timings):8.1f} ms  max={max(timings):8.1f} ms"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
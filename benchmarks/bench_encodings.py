@@ -0,0 +1,97 @@
+"""Bytes on the wire and encode CPU time per response format.
+
+Encodes a ``TaskWithEntries`` payload (the shape returned by
+``GET /api/tasks/{id}``) and a task list the same way ``NegotiatedResponse``
+does::
+
+    python benchmarks/bench_encodings.py --entries 5000
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import msgpack  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.encoding import compress  # noqa: E402
+from app.schemas import TaskResponse, TaskWithEntries  # noqa: E402
+
+
+def build_payloads(entries: int, tasks: int) -> dict[str, object]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    base = {
+        "title": "Quarterly report",
+        "description": "Collect numbers from every team and write the summary",
+        "priority": "high",
+        "status": "in_progress",
+        "user_id": 1,
+        "created_at": start,
+        "updated_at": start,
+    }
+    detail = TaskWithEntries(
+        id=1,
+        total_time_seconds=entries * 1800.0,
+        time_entries=[
+            {
+                "id": i,
+                "task_id": 1,
+                "start_time": start + timedelta(hours=i),
+                "end_time": start + timedelta(hours=i, minutes=30),
+                "duration_seconds": 1800.0,
+                "created_at": start + timedelta(hours=i),
+            }
+            for i in range(entries)
+        ],
+        **base,
+    )
+    listing = [TaskResponse(id=i, total_time_seconds=i * 60.0, **base) for i in range(tasks)]
+    return {
+        f"task detail ({entries} entries)": jsonable_encoder(detail),
+        f"task list ({tasks} tasks)": jsonable_encoder(listing),
+    }
+
+
+def measure(fn, repeat: int) -> tuple[bytes, float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return body, statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, content in build_payloads(args.entries, args.tasks).items():
+        print(name)
+        print(f"  {'format':<16}{'bytes':>10}{'ratio':>8}{'encode ms':>12}")
+        raw = {
+            "json": measure(lambda: JSONResponse(content).body, args.repeat),
+            "msgpack": measure(lambda: msgpack.packb(content, use_bin_type=True), args.repeat),
+        }
+        baseline = len(raw["json"][0])
+        for fmt, (body, encode_ms) in raw.items():
+            rows = [(fmt, body, encode_ms)]
+            for encoding in ("gzip", "br"):
+                packed, compress_ms = measure(lambda: compress(body, encoding), args.repeat)
+                rows.append((f"{fmt}+{encoding}", packed, encode_ms + compress_ms))
+            for label, payload, ms in rows:
+                print(f"  {label:<16}{len(payload):>10}{len(payload) / baseline:>8.2f}{ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
+import os
 import sys
+import tempfile
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+# Run the app against a throwaway SQLite file unless a database is configured.
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+pysqlite:///{Path(tempfile.mkdtemp()) / 'test.db'}",
+)
@@ -0,0 +1,108 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from app.admission import AdmissionControlMiddleware, RouteClassLimiter, build_limiters, classify
+
+
+def test_classify_routes() -> None:
+    assert classify("/api/auth/login") == "auth"
+    assert classify("/api/tasks/12/start") == "timer"
+    assert classify("/api/tasks/12/stop") == "timer"
+    assert classify("/api/time-summary") == "reports"
+    assert classify("/api/sync") == "sync"
+    assert classify("/api/import/time-entries") == "import"
+    assert classify("/api/import/toggl-2024") == "default"
+    assert classify("/api/tasks") == "default"
+    assert classify("/api/health") is None
+    assert classify("/assets/app.js") is None
+
+
+def build_app(limiters: dict[str, RouteClassLimiter], release: asyncio.Event) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(AdmissionControlMiddleware, limiters=limiters)
+
+    @app.get("/api/time-summary")
+    async def slow_summary():
+        await release.wait()
+        return {"ok": True}
+
+    @app.post("/api/tasks/{task_id}/start")
+    async def start(task_id: int):
+        return {"task_id": task_id}
+
+    return app
+
+
+def test_sheds_saturated_class_without_blocking_others() -> None:
+    async def scenario():
+        release = asyncio.Event()
+        limiters = {
+            "reports": RouteClassLimiter("reports", concurrency=1, max_queue=0, queue_timeout=0.05),
+            "timer": RouteClassLimiter("timer", concurrency=1, max_queue=1, queue_timeout=1.0),
+        }
+        transport = httpx.ASGITransport(app=build_app(limiters, release))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/api/time-summary"))
+            await asyncio.sleep(0.01)
+
+            shed = await client.get("/api/time-summary")
+            timer = await client.post("/api/tasks/3/start")
+
+            release.set()
+            done = await first
+        return limiters, shed, timer, done
+
+    limiters, shed, timer, done = asyncio.run(scenario())
+
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "1"
+    assert timer.status_code == 200
+    assert done.status_code == 200
+    assert limiters["reports"].stats() == {
+        "concurrency": 1,
+        "active": 0,
+        "queue_depth": 0,
+        "admitted": 1,
+        "shed": 1,
+    }
+
+
+def test_queued_request_times_out() -> None:
+    async def scenario():
+        limiter = RouteClassLimiter("reports", concurrency=1, max_queue=4, queue_timeout=0.01)
+        assert await limiter.acquire()
+        admitted = await limiter.acquire()
+        limiter.release()
+        return limiter, admitted
+
+    limiter, admitted = asyncio.run(scenario())
+    assert admitted is False
+    assert limiter.shed == 1
+
+
+def test_limiter_works_across_event_loops() -> None:
+    limiter = RouteClassLimiter("reports", concurrency=1, max_queue=4, queue_timeout=1.0)
+
+    async def contend():
+        assert await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        limiter.release()
+        admitted = await waiter
+        limiter.release()
+        return admitted
+
+    assert asyncio.run(contend())
+    assert asyncio.run(contend())
+    assert limiter.stats()["active"] == 0
+    assert limiter.stats()["admitted"] == 4
+
+
+def test_limits_fit_in_db_pool() -> None:
+    limiters = build_limiters(pool_capacity=15)
+    concurrency = {name: limiter.concurrency for name, limiter in limiters.items()}
+
+    assert concurrency == {"auth": 2, "timer": 4, "reports": 2, "sync": 2, "import": 1, "default": 4}
+    assert sum(concurrency.values()) == 15
@@ -0,0 +1,131 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.analytics import _nearest_rank, _streaks, compute_analytics
+from app.archive import archive_time_entries
+from app.database import IS_SQLITE, Base, SessionLocal
+from app.models import Task, TimeEntry, User
+
+
+def build_session() -> Session:
+    engine = create_engine("sqlite+pysqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)
+    return SessionLocal()
+
+
+def add_entry(db: Session, task: Task, start: datetime, minutes: int) -> None:
+    db.add(
+        TimeEntry(
+            task_id=task.id,
+            start_time=start,
+            end_time=start + timedelta(minutes=minutes),
+            duration_seconds=minutes * 60.0,
+        )
+    )
+
+
+def day(d: int, hour: int = 9) -> datetime:
+    return datetime(2021, 6, d, hour, tzinfo=timezone.utc)
+
+
+def test_compute_analytics() -> None:
+    db = build_session()
+    try:
+        user = User(username="alice", email="alice@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        report = Task(title="Report", priority="high", status="done", due_date=date(2021, 6, 2), user_id=user.id)
+        chores = Task(title="Chores", priority="low", status="pending", user_id=user.id)
+        db.add_all([report, chores])
+        db.commit()
+
+        add_entry(db, report, day(1), 60)
+        add_entry(db, report, day(2), 30)
+        add_entry(db, report, day(3), 90)  # after due date
+        add_entry(db, chores, day(3, 14), 10)
+        add_entry(db, chores, day(6), 20)
+        add_entry(db, chores, day(20), 600)  # outside range
+        db.add(TimeEntry(task_id=chores.id, start_time=day(6, 15)))  # still running
+        db.commit()
+
+        stats = compute_analytics(db, user.id, day(1, 0), day(7, 0))
+
+        assert stats["entry_count"] == 5
+        assert stats["total_seconds"] == 210 * 60
+        assert stats["average_session_seconds"] == 42 * 60
+        assert stats["session_percentiles"] == {"p50": 1800.0, "p90": 5400.0, "p95": 5400.0}
+        assert stats["session_percentiles_entry_count"] == 5
+        assert stats["by_priority"] == [
+            {"key": "high", "total_seconds": 180 * 60, "entry_count": 3},
+            {"key": "low", "total_seconds": 30 * 60, "entry_count": 2},
+        ]
+        assert [b["key"] for b in stats["by_status"]] == ["done", "pending"]
+        assert stats["overdue_seconds"] == 90 * 60
+        assert stats["overdue_task_count"] == 1
+        assert stats["active_days"] == 4
+        assert stats["longest_streak_days"] == 3
+        assert stats["current_streak_days"] == 1
+    finally:
+        db.close()
+
+
+def test_compute_analytics_includes_archived_totals() -> None:
+    db = build_session()
+    try:
+        user = User(username="alice", email="alice@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        task = Task(title="Old", priority="medium", user_id=user.id)
+        db.add(task)
+        db.commit()
+        add_entry(db, task, day(1), 60)
+        add_entry(db, task, day(2), 30)
+        db.commit()
+
+        archive_time_entries(db, older_than_days=30)
+        stats = compute_analytics(db, user.id, day(1, 0), day(3, 0))
+
+        assert stats["total_seconds"] == 90 * 60
+        assert stats["entry_count"] == 2
+        assert stats["longest_streak_days"] == 2
+        assert stats["session_percentiles_entry_count"] == 0
+    finally:
+        db.close()
+
+
+@pytest.mark.skipif(IS_SQLITE, reason="PostgreSQL session time zones only")
+def test_days_are_utc_whatever_the_session_time_zone() -> None:
+    db = SessionLocal()
+    try:
+        name = f"tz-{uuid.uuid4().hex[:8]}"
+        user = User(username=name, email=f"{name}@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        task = Task(title="Late", due_date=date(2021, 6, 1), user_id=user.id)
+        db.add(task)
+        db.commit()
+        add_entry(db, task, day(2, 2), 60)  # still June 1 in Los Angeles
+        db.commit()
+
+        db.execute(text("SET LOCAL TIME ZONE 'America/Los_Angeles'"))
+        stats = compute_analytics(db, user.id, day(1, 0), day(3, 0))
+
+        assert stats["current_streak_days"] == 1
+        assert stats["overdue_seconds"] == 3600
+    finally:
+        db.rollback()
+        db.close()
+
+
+def test_rank_and_streaks_helpers() -> None:
+    assert [_nearest_rank(p, 10) for p in (50, 90, 95)] == [4, 8, 9]
+    assert _nearest_rank(50, 1) == 0
+
+    days = [date(2021, 1, d) for d in (1, 2, 4, 5, 6)]
+    assert _streaks(days, date(2021, 1, 6)) == (3, 3)
+    assert _streaks(days, date(2021, 1, 7)) == (3, 0)
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import archive
+from app.archive import (
+    archive_time_entries,
+    archived_daily_totals,
+    archived_entries,
+    archived_seconds_by_task,
+)
+from app.database import Base
+from app.models import Task, TimeEntry, User
+from app.routes.tasks import get_task
+from app.routes.time_entries import list_time_entries
+
+
+def build_session() -> Session:
+    engine = create_engine("sqlite+pysqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)
+    return SessionLocal()
+
+
+def add_task_with_entries(db: Session, starts: list[datetime], seconds: float = 600) -> Task:
+    user = User(username="alice", email="alice@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    task = Task(title="Old work", user_id=user.id)
+    db.add(task)
+    db.commit()
+    for start in starts:
+        db.add(
+            TimeEntry(
+                task_id=task.id,
+                start_time=start,
+                end_time=start + timedelta(seconds=seconds),
+                duration_seconds=seconds,
+            )
+        )
+    db.commit()
+    return task
+
+
+def test_archive_moves_old_entries_and_keeps_totals() -> None:
+    db = build_session()
+    try:
+        now = datetime.now(timezone.utc)
+        old = datetime(2020, 3, 5, 9, 0, tzinfo=timezone.utc)
+        task = add_task_with_entries(db, [old, old + timedelta(hours=2), now - timedelta(days=1)])
+
+        moved = archive_time_entries(db, older_than_days=30, batch_size=1)
+
+        assert moved == 2
+        assert db.query(TimeEntry).count() == 1
+        assert archived_seconds_by_task(db, [task.id]) == {task.id: 1200}
+
+        rows = archived_entries(db, task.id)
+        assert [r["start_time"] for r in rows] == [old, old + timedelta(hours=2)]
+        assert all(r["task_id"] == task.id for r in rows)
+
+        totals = archived_daily_totals(
+            db, task.user_id, datetime(2020, 3, 5, tzinfo=timezone.utc), datetime(2020, 3, 6, tzinfo=timezone.utc)
+        )
+        assert [(t.task_id, t.total_seconds, t.entry_count) for t in totals] == [(task.id, 1200, 2)]
+    finally:
+        db.close()
+
+
+def test_archived_entries_respects_range() -> None:
+    db = build_session()
+    try:
+        march = datetime(2020, 3, 5, 9, 0, tzinfo=timezone.utc)
+        april = datetime(2020, 4, 7, 9, 0, tzinfo=timezone.utc)
+        task = add_task_with_entries(db, [march, april])
+        archive_time_entries(db, older_than_days=30)
+
+        rows = archived_entries(
+            db, task.id, datetime(2020, 4, 1, tzinfo=timezone.utc), datetime(2020, 5, 1, tzinfo=timezone.utc)
+        )
+        assert [r["start_time"] for r in rows] == [april]
+    finally:
+        db.close()
+
+
+def test_archived_ids_are_not_reused() -> None:
+    db = build_session()
+    try:
+        now = datetime.now(timezone.utc)
+        task = add_task_with_entries(db, [datetime(2020, 3, 5, 9, 0, tzinfo=timezone.utc)])
+        archived_id = db.query(TimeEntry.id).scalar()
+        archive_time_entries(db, older_than_days=30)
+
+        entry = TimeEntry(task_id=task.id, start_time=now, end_time=now, duration_seconds=0)
+        db.add(entry)
+        db.commit()
+
+        assert entry.id > archived_id
+        assert [r["id"] for r in archived_entries(db, task.id)] == [archived_id]
+    finally:
+        db.close()
+
+
+def test_listings_decode_only_segments_in_range(monkeypatch) -> None:
+    db = build_session()
+    try:
+        now = datetime.now(timezone.utc)
+        march = datetime(2020, 3, 5, 9, 0, tzinfo=timezone.utc)
+        april = datetime(2020, 4, 7, 9, 0, tzinfo=timezone.utc)
+        task = add_task_with_entries(db, [march, april, now - timedelta(days=1)])
+        archive_time_entries(db, older_than_days=30)
+        user = db.get(User, task.user_id)
+        decoded = []
+        real_decode = archive._decode
+        monkeypatch.setattr(archive, "_decode", lambda payload: decoded.append(1) or real_decode(payload))
+
+        hot_only = list_time_entries(task.id, start_date=None, end_date=None, db=db, current_user=user)
+        assert len(hot_only) == 1
+        detail = get_task(task.id, db=db, current_user=user)
+        assert len(detail["time_entries"]) == 1
+        assert detail["total_time_seconds"] == 1800
+        assert decoded == []
+
+        in_range = list_time_entries(task.id, start_date="2020-04-01", end_date="2020-04-30", db=db, current_user=user)
+        assert [entry["start_time"] for entry in in_range] == [april]
+        assert decoded == [1]
+    finally:
+        db.close()
+
+
+def test_archive_skips_running_timers() -> None:
+    db = build_session()
+    try:
+        task = add_task_with_entries(db, [])
+        db.add(TimeEntry(task_id=task.id, start_time=datetime(2020, 1, 1, tzinfo=timezone.utc)))
+        db.commit()
+
+        assert archive_time_entries(db, older_than_days=30) == 0
+        assert db.query(TimeEntry).count() == 1
+    finally:
+        db.close()
@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool, SingletonThreadPool
+
+from app import database
+from app.database import IS_SQLITE, engine
+from app.main import app
+
+pytestmark = pytest.mark.skipif(not IS_SQLITE, reason="SQLite backend only")
+
+
+def test_pool_arguments_only_for_queue_pool() -> None:
+    url = "sqlite+pysqlite:///:memory:"
+    memory = create_engine(url, **database.pool_arguments(url))
+    assert isinstance(memory.pool, SingletonThreadPool)
+
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == database.DB_POOL_SIZE
+
+
+def test_sqlite_pragmas_applied() -> None:
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+        assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+
+
+def test_concurrent_timer_writes_do_not_lock() -> None:
+    client = TestClient(app)
+    run_concurrent_timer_writes(client)
+
+
+def run_concurrent_timer_writes(client: TestClient) -> None:
+    resp = client.post(
+        "/api/auth/register",
+        json={"username": "sqlite-user", "email": "sqlite@example.com", "password": "secret123"},
+    )
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    task_ids = [
+        client.post("/api/tasks", json={"title": f"Task {i}"}, headers=headers).json()["id"]
+        for i in range(8)
+    ]
+
+    def toggle(task_id: int) -> list[int]:
+        codes = []
+        for _ in range(3):
+            codes.append(client.post(f"/api/tasks/{task_id}/start", headers=headers).status_code)
+            codes.append(client.post(f"/api/tasks/{task_id}/stop", headers=headers).status_code)
+        return codes
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(toggle, task_ids))
+
+    assert all(code == 200 for codes in results for code in codes)
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM time_entries")).scalar() == 24
+
+
+def test_writer_slot_is_held_only_by_write_transactions(monkeypatch) -> None:
+    client = TestClient(app)
+    resp = client.post(
+        "/api/auth/register",
+        json={"username": "slot-user", "email": "slot@example.com", "password": "secret123"},
+    )
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    task_id = client.post("/api/tasks", json={"title": "Slot"}, headers=headers).json()["id"]
+    monkeypatch.setattr(database, "SQLITE_WRITE_TIMEOUT", 0.2)
+
+    writer = database.SessionLocal()
+    try:
+        writer.execute(text("UPDATE tasks SET title = 'Held' WHERE id = :id"), {"id": task_id})
+
+        # A POST that only reads is not serialised behind the open write.
+        login = client.post("/api/auth/login", json={"username": "slot-user", "password": "secret123"})
+        assert login.status_code == 200
+        busy = client.post(f"/api/tasks/{task_id}/start", headers=headers)
+        assert busy.status_code == 503
+        assert busy.headers["retry-after"] == "1"
+    finally:
+        writer.commit()
+        writer.close()
+
+    assert client.post(f"/api/tasks/{task_id}/start", headers=headers).status_code == 200
+
+
+def test_concurrent_starts_of_one_task_run_one_timer() -> None:
+    client = TestClient(app)
+    resp = client.post(
+        "/api/auth/register",
+        json={"username": "race-user", "email": "race@example.com", "password": "secret123"},
+    )
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    task_id = client.post("/api/tasks", json={"title": "Race"}, headers=headers).json()["id"]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        codes = list(pool.map(
+            lambda _: client.post(f"/api/tasks/{task_id}/start", headers=headers).status_code, range(4)
+        ))
+
+    assert sorted(codes) == [200, 400, 400, 400]
+    with engine.connect() as conn:
+        running = conn.execute(
+            text("SELECT COUNT(*) FROM time_entries WHERE task_id = :id AND end_time IS NULL"), {"id": task_id}
+        ).scalar()
+    assert running == 1
+
+
+def test_write_on_stale_snapshot_is_retryable() -> None:
+    reader = database.SessionLocal()
+    try:
+        reader.execute(text("SELECT COUNT(*) FROM tasks")).scalar()  # snapshot taken here
+        with database.WriteSessionLocal() as writer:
+            writer.execute(text("UPDATE users SET email = email"))
+            writer.commit()
+
+        with pytest.raises(database.DatabaseBusyError):
+            reader.execute(text("UPDATE users SET email = email"))
+    finally:
+        reader.rollback()
+        reader.close()
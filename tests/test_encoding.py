@@ -0,0 +1,131 @@
+import asyncio
+import gzip
+import uuid
+
+import brotli
+import msgpack
+from fastapi.testclient import TestClient
+
+from app.encoding import DECOMPRESS_BLOCK_SIZE, choose_encoding, decode_stream
+from app.main import app
+
+client = TestClient(app)
+
+
+def auth_headers() -> dict:
+    name = f"encoder-{uuid.uuid4().hex[:8]}"
+    resp = client.post(
+        "/api/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": "secret123"},
+    )
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_choose_encoding() -> None:
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
+    assert choose_encoding("identity") is None
+    assert choose_encoding("") is None
+
+
+def test_msgpack_response() -> None:
+    headers = auth_headers()
+    client.post("/api/tasks", json={"title": "Packed"}, headers=headers)
+
+    resp = client.get("/api/tasks", headers={**headers, "Accept": "application/msgpack"})
+
+    assert resp.headers["content-type"] == "application/msgpack"
+    assert [t["title"] for t in msgpack.unpackb(resp.content)] == ["Packed"]
+
+
+def test_compresses_only_large_bodies() -> None:
+    headers = auth_headers()
+    small = client.get("/api/tasks", headers={**headers, "Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    for i in range(20):
+        client.post("/api/tasks", json={"title": f"Task {i}", "description": "x" * 200}, headers=headers)
+    large = client.get("/api/tasks", headers={**headers, "Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.headers["vary"] == "Accept, Accept-Encoding"
+    assert len(large.json()) == 20
+
+
+def test_import_accepts_compressed_msgpack() -> None:
+    headers = auth_headers()
+    for encoding, compress in (("gzip", gzip.compress), ("br", brotli.compress)):
+        task_id = client.post("/api/tasks", json={"title": encoding}, headers=headers).json()["id"]
+        body = b"".join(
+            msgpack.packb({
+                "task_id": task_id,
+                "start_time": f"2022-03-0{day}T09:00:00",
+                "end_time": f"2022-03-0{day}T10:00:00",
+            })
+            for day in range(1, 6)
+        )
+
+        resp = client.post(
+            "/api/import/time-entries",
+            content=compress(body),
+            headers={**headers, "Content-Type": "application/msgpack", "Content-Encoding": encoding},
+        )
+
+        assert resp.status_code == 200
+        assert resp.json()["imported"] == 5
+
+
+def test_decode_stream_bounds_output_blocks() -> None:
+    raw = b"\0" * (20 * 1024 * 1024)
+    for encoding, compress in (("gzip", gzip.compress), ("br", brotli.compress)):
+        body = compress(raw)
+
+        async def chunks():
+            yield body
+
+        async def sizes():
+            return [len(block) async for block in decode_stream(chunks(), encoding)]
+
+        blocks = asyncio.run(sizes())
+        assert sum(blocks) == len(raw)
+        assert max(blocks) < 2 * DECOMPRESS_BLOCK_SIZE
+
+
+def test_import_rejects_truncated_body() -> None:
+    headers = auth_headers()
+    task_id = client.post("/api/tasks", json={"title": "Cut off"}, headers=headers).json()["id"]
+    body = "".join(
+        f"{task_id},2022-04-{day:02d}T09:00:00,2022-04-{day:02d}T10:00:00\n" for day in range(1, 29)
+    )
+    for encoding, compress in (("gzip", gzip.compress), ("br", brotli.compress)):
+        payload = compress(("task_id,start_time,end_time\n" + body).encode())
+        resp = client.post(
+            "/api/import/time-entries",
+            content=payload[: len(payload) // 2],
+            headers={**headers, "Content-Type": "text/csv", "Content-Encoding": encoding},
+        )
+
+        assert resp.status_code == 400
+        assert "Truncated" in resp.json()["detail"]
+
+
+def test_import_reads_every_gzip_member() -> None:
+    headers = auth_headers()
+    task_id = client.post("/api/tasks", json={"title": "Members"}, headers=headers).json()["id"]
+    members = [b"task_id,start_time,end_time\n"] + [
+        f"{task_id},2022-05-{day:02d}T09:00:00,2022-05-{day:02d}T10:00:00\n".encode() for day in (1, 2)
+    ]
+
+    resp = client.post(
+        "/api/import/time-entries",
+        content=b"".join(gzip.compress(member) for member in members),
+        headers={**headers, "Content-Type": "text/csv", "Content-Encoding": "gzip"},
+    )
+    assert resp.status_code == 200
+    assert (resp.json()["rows_read"], resp.json()["imported"]) == (2, 2)
+
+    garbage = client.post(
+        "/api/import/time-entries",
+        content=gzip.compress(members[0]) + b"not gzip",
+        headers={**headers, "Content-Type": "text/csv", "Content-Encoding": "gzip"},
+    )
+    assert garbage.status_code == 400
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.archive import archive_time_entries
+from app.database import Base, engine
+from app.importer import MAX_LINE_LENGTH, ImportProgress, TimeEntryImporter, iter_lines
+from app.main import app
+from app.models import Task, TimeEntry, User
+
+client = TestClient(app)
+
+
+def auth_headers() -> dict:
+    name = f"importer-{uuid.uuid4().hex[:8]}"
+    resp = client.post(
+        "/api/auth/register",
+        json={"username": name, "email": f"{name}@example.com", "password": "secret123"},
+    )
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_csv_import_validates_rows() -> None:
+    headers = auth_headers()
+    task_id = client.post("/api/tasks", json={"title": "Legacy"}, headers=headers).json()["id"]
+    other_task_id = client.post("/api/tasks", json={"title": "Not mine"}, headers=auth_headers()).json()["id"]
+
+    body = "\n".join([
+        "task_id,start_time,end_time",
+        f"{task_id},2021-01-04T09:00:00,2021-01-04T10:00:00",
+        f"{task_id},2021-01-04T09:30:00,2021-01-04T11:00:00",  # overlaps previous row
+        f"{task_id},2021-01-05T09:00:00Z,2021-01-05T09:30:00Z",
+        f"{task_id},2021-01-06T10:00:00,2021-01-06T09:00:00",  # ends before it starts
+        f"{other_task_id},2021-01-07T09:00:00,2021-01-07T10:00:00",  # someone else's task
+        f"{task_id},yesterday,today",
+    ])
+    resp = client.post(
+        "/api/import/time-entries",
+        params={"import_id": "csv-test"},
+        content=body.encode(),
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+
+    assert resp.status_code == 200
+    result = resp.json()
+    assert result["status"] == "completed"
+    assert (result["rows_read"], result["imported"], result["rejected"]) == (6, 2, 4)
+    assert sorted(e["line"] for e in result["errors"]) == [3, 5, 6, 7]
+
+    entries = client.get(f"/api/tasks/{task_id}/time-entries", headers=headers).json()
+    assert [e["duration_seconds"] for e in entries] == [1800, 3600]
+
+    progress = client.get("/api/import/csv-test", headers=headers).json()
+    assert progress["imported"] == 2
+
+
+def test_ndjson_import_creates_missing_tasks_and_rejects_overlap_with_stored() -> None:
+    headers = auth_headers()
+    lines = [
+        {"task_title": "From Toggl", "start_time": "2020-05-01T08:00:00+02:00", "end_time": "2020-05-01T09:00:00+02:00"},
+        {"task_title": "From Toggl", "start_time": "2020-05-02T08:00:00", "end_time": "2020-05-02T08:15:00"},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines)
+    resp = client.post(
+        "/api/import/time-entries",
+        params={"create_missing_tasks": "true"},
+        content=body.encode(),
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert resp.json()["imported"] == 2
+
+    tasks = client.get("/api/tasks", headers=headers).json()
+    assert [(t["title"], t["total_time_seconds"]) for t in tasks] == [("From Toggl", 4500)]
+
+    again = client.post(
+        "/api/import/time-entries",
+        content=json.dumps(lines[0]).encode(),
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    ).json()
+    assert (again["imported"], again["rejected"]) == (0, 1)
+
+
+def test_iter_lines_joins_lines_split_across_chunks() -> None:
+    async def chunks():
+        for chunk in (b"a,b\r\nfir", b"st", b",1\nsecond,2\n", b"last"):
+            yield chunk
+
+    async def collect():
+        return [line async for line in iter_lines(chunks())]
+
+    assert asyncio.run(collect()) == ["a,b", "first,1", "second,2", "last"]
+
+
+def test_import_rejects_overlong_line() -> None:
+    headers = auth_headers()
+    body = b"task_id,start_time,end_time\n" + b"x" * (MAX_LINE_LENGTH + 1)
+    resp = client.post(
+        "/api/import/time-entries",
+        params={"import_id": "too-long"},
+        content=body,
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+
+    assert resp.status_code == 400
+    assert client.get("/api/import/too-long", headers=headers).json()["status"] == "failed"
+
+
+def test_import_skips_archived_entries() -> None:
+    engine = create_engine("sqlite+pysqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)
+    with SessionLocal() as db:
+        user = User(username="archivist", email="archivist@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        task = Task(title="Old", user_id=user.id)
+        db.add(task)
+        db.commit()
+        user_id, task_id = user.id, task.id
+        start = datetime(2020, 3, 5, 9, 0, tzinfo=timezone.utc)
+        db.add(TimeEntry(task_id=task_id, start_time=start, end_time=start + timedelta(hours=1), duration_seconds=3600))
+        db.commit()
+        assert archive_time_entries(db, older_than_days=30) == 1
+
+    job = ImportProgress(import_id="reimport", user_id=user_id)
+    TimeEntryImporter(SessionLocal, job).load_batch([
+        (2, {"task_id": task_id, "start_time": "2020-03-05T09:00:00", "end_time": "2020-03-05T10:00:00"}),
+        (3, {"task_id": task_id, "start_time": "2020-03-05T10:00:00", "end_time": "2020-03-05T10:30:00"}),
+    ])
+
+    assert (job.imported, job.rejected) == (1, 1)
+    assert job.errors[0]["line"] == 2
+
+
+def test_import_ids_are_scoped_per_user() -> None:
+    first, second = auth_headers(), auth_headers()
+    for headers in (first, second):
+        resp = client.post(
+            "/api/import/time-entries",
+            params={"import_id": "toggl-2024"},
+            content=b"task_id,start_time,end_time\n,2021-01-01T09:00:00,2021-01-01T10:00:00",
+            headers={**headers, "Content-Type": "text/csv"},
+        )
+        assert resp.status_code == 200
+
+    for headers in (first, second):
+        progress = client.get("/api/import/toggl-2024", headers=headers)
+        assert progress.status_code == 200
+        assert progress.json()["rejected"] == 1
+
+
+def test_import_rejects_unknown_content_type() -> None:
+    resp = client.post(
+        "/api/import/time-entries",
+        content=b"{}",
+        headers={**auth_headers(), "Content-Type": "application/json"},
+    )
+    assert resp.status_code == 415
+
+
+def test_slow_upload_does_not_block_other_writes() -> None:
+    headers = auth_headers()
+    task_id = client.post("/api/tasks", json={"title": "Slow"}, headers=headers).json()["id"]
+    timer_task_id = client.post("/api/tasks", json={"title": "Timer"}, headers=headers).json()["id"]
+
+    async def scenario():
+        resume = asyncio.Event()
+
+        async def body():
+            yield f"task_id,start_time,end_time\n{task_id},2021-02-01T09:00:00,2021-02-01T10:00:00\n".encode()
+            await resume.wait()
+            yield f"{task_id},2021-02-02T09:00:00,2021-02-02T10:00:00\n".encode()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            upload = asyncio.create_task(
+                async_client.post(
+                    "/api/import/time-entries",
+                    content=body(),
+                    headers={**headers, "Content-Type": "text/csv"},
+                )
+            )
+            await asyncio.sleep(0.3)  # upload now waiting for more of the body
+            idle_connections = engine.pool.checkedout()
+            started = await asyncio.wait_for(
+                async_client.post(f"/api/tasks/{timer_task_id}/start", headers=headers), timeout=5
+            )
+            resume.set()
+            return idle_connections, started, await upload
+
+    idle_connections, started, uploaded = asyncio.run(scenario())
+
+    assert idle_connections == 0
+    assert started.status_code == 200
+    assert uploaded.status_code == 200
+    assert uploaded.json()["imported"] == 2
@@ -0,0 +1,27 @@
+from sqlalchemy import create_engine, inspect
+
+from app.schema import upgrade_schema
+
+
+def test_upgrade_adds_missing_columns_and_indexes() -> None:
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    with engine.begin() as conn:
+        # time_entries as created before updated_at and the covering index existed.
+        conn.exec_driver_sql(
+            "CREATE TABLE time_entries (id INTEGER PRIMARY KEY, task_id INTEGER, "
+            "start_time DATETIME NOT NULL, end_time DATETIME, duration_seconds FLOAT, created_at DATETIME)"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO time_entries (task_id, start_time, created_at) "
+            "VALUES (1, '2021-01-01 09:00:00', '2021-01-01 09:00:00')"
+        )
+
+    upgrade_schema(engine)
+    upgrade_schema(engine)  # idempotent
+
+    inspector = inspect(engine)
+    assert "updated_at" in {c["name"] for c in inspector.get_columns("time_entries")}
+    assert "ix_time_entries_task_id_start_time" in {i["name"] for i in inspector.get_indexes("time_entries")}
+    assert "change_log" in inspector.get_table_names()
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT updated_at FROM time_entries").scalar() == "2021-01-01 09:00:00"
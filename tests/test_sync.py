@@ -0,0 +1,143 @@
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import Base, SessionLocal
+from app.models import Task, TimeEntry, User
+from app.sync import collect_changes
+
+
+def build_session() -> Session:
+    engine = create_engine("sqlite+pysqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, class_=Session)
+    return SessionLocal()
+
+
+def add_user(db: Session, username: str) -> User:
+    user = User(username=username, email=f"{username}@example.com", hashed_password="x")
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_sync_returns_everything_from_zero() -> None:
+    db = build_session()
+    try:
+        user = add_user(db, "alice")
+        task = Task(title="Write docs", user_id=user.id)
+        db.add(task)
+        db.commit()
+        db.add(TimeEntry(task_id=task.id, start_time=datetime.now(timezone.utc)))
+        db.commit()
+
+        changes = collect_changes(db, user.id)
+
+        assert [t.title for t in changes["tasks"]] == ["Write docs"]
+        assert len(changes["time_entries"]) == 1
+        assert changes["token"] > 0
+        assert changes["deleted_task_ids"] == []
+    finally:
+        db.close()
+
+
+def test_sync_only_returns_changes_after_token() -> None:
+    db = build_session()
+    try:
+        user = add_user(db, "alice")
+        first = Task(title="First", user_id=user.id)
+        second = Task(title="Second", user_id=user.id)
+        db.add_all([first, second])
+        db.commit()
+        token = collect_changes(db, user.id)["token"]
+
+        second.status = "done"
+        db.commit()
+
+        changes = collect_changes(db, user.id, since=token)
+        assert [t.title for t in changes["tasks"]] == ["Second"]
+        assert changes["token"] > token
+
+        assert collect_changes(db, user.id, since=changes["token"])["tasks"] == []
+    finally:
+        db.close()
+
+
+def test_sync_reports_tombstones_for_cascaded_deletes() -> None:
+    db = build_session()
+    try:
+        user = add_user(db, "alice")
+        task = Task(title="Gone soon", user_id=user.id)
+        db.add(task)
+        db.commit()
+        entry = TimeEntry(task_id=task.id, start_time=datetime.now(timezone.utc))
+        db.add(entry)
+        db.commit()
+        task_id, entry_id = task.id, entry.id
+        token = collect_changes(db, user.id)["token"]
+
+        db.delete(task)
+        db.commit()
+
+        changes = collect_changes(db, user.id, since=token)
+        assert changes["tasks"] == []
+        assert changes["deleted_task_ids"] == [task_id]
+        assert changes["deleted_time_entry_ids"] == [entry_id]
+    finally:
+        db.close()
+
+
+def test_sync_is_scoped_to_user_and_paginates() -> None:
+    db = build_session()
+    try:
+        alice = add_user(db, "alice")
+        bob = add_user(db, "bob")
+        db.add_all([Task(title=f"Task {i}", user_id=alice.id) for i in range(3)])
+        db.add(Task(title="Bob's task", user_id=bob.id))
+        db.commit()
+
+        page = collect_changes(db, alice.id, limit=2)
+        assert len(page["tasks"]) == 2
+        assert page["has_more"] is True
+
+        rest = collect_changes(db, alice.id, since=page["token"], limit=2)
+        assert [t.title for t in rest["tasks"]] == ["Task 2"]
+        assert rest["has_more"] is False
+    finally:
+        db.close()
+
+
+def test_sync_token_never_skips_a_change_committed_later() -> None:
+    """Two interleaved writers on the configured backend: the later one cannot
+    commit its change ahead of the earlier one's, so no token skips a change."""
+    db = SessionLocal()
+    try:
+        user = add_user(db, f"sync-{uuid.uuid4().hex[:8]}")
+        first = SessionLocal()
+        first.add(Task(title="first", user_id=user.id))
+        first.flush()  # takes the lower change id, not yet committed
+
+        def write_second() -> None:
+            with SessionLocal() as second:
+                second.add(Task(title="second", user_id=user.id))
+                second.commit()
+
+        writer = threading.Thread(target=write_second)
+        writer.start()
+        time.sleep(0.3)
+        early = collect_changes(db, user.id)
+        db.rollback()
+
+        first.commit()
+        first.close()
+        writer.join(timeout=10)
+        late = collect_changes(db, user.id, since=early["token"])
+
+        titles = [t.title for t in early["tasks"]] + [t.title for t in late["tasks"]]
+        assert sorted(titles) == ["first", "second"]
+    finally:
+        db.close()